@@ -1,9 +1,133 @@
+import io
 import os
+import re
+import sys
 import argparse
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import hashlib
+import threading
+import email.utils
+from collections import OrderedDict
+from functools import partial
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from compress import is_compressible, negotiate
+
+LIVERELOAD_PATH = "/__livereload"
+LIVERELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVERELOAD_PATH}").onmessage = () => location.reload();</script>'
+).encode()
+
+
+class LiveReload:
+    def __init__(self) -> None:
+        self.version = 0
+        self.condition = threading.Condition()
+
+    def notify(self, *_):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class FileEntry:
+    __slots__ = ("path", "mtime_ns", "source_size", "size", "etag", "last_modified", "data")
+
+    def __init__(self, path, stat, data=None) -> None:
+        self.path = path
+        self.mtime_ns = stat.st_mtime_ns
+        self.source_size = stat.st_size
+        self.size = stat.st_size if data is None else len(data)
+        self.data = data
+        if data is not None:
+            self.etag = f'"{hashlib.blake2b(data, digest_size=12).hexdigest()}"'
+        else:
+            self.etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        self.last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+
+
+class FileCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_file_bytes=1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, transform=None):
+        stat = os.stat(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.source_size == stat.st_size:
+                self.entries.move_to_end(path)
+                return entry
+        if stat.st_size > self.max_file_bytes and transform is None:
+            return FileEntry(path, stat)
+        with open(path, 'rb') as f:
+            data = f.read()
+        if transform is not None:
+            data = transform(data)
+        entry = FileEntry(path, stat, data)
+        with self.lock:
+            previous = self.entries.pop(path, None)
+            if previous is not None:
+                self.size -= previous.size
+            if entry.size <= self.max_bytes:
+                self.entries[path] = entry
+                self.size += entry.size
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= evicted.size
+        return entry
+
+
+class FileRange:
+    def __init__(self, path, offset, count) -> None:
+        self.file = open(path, 'rb')
+        self.offset = offset
+        self.count = count
+
+    def close(self):
+        self.file.close()
+
+
+RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    match = RANGE.match(header.strip())
+    if match is None or not any(match.groups()):
+        return None
+    start, end = match.groups()
+    if not start:
+        length = min(int(end), size)
+        return (size - length, size - 1) if length else False
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def inject_livereload(body):
+    index = body.rfind(b"</body>")
+    if index == -1:
+        return body + LIVERELOAD_SCRIPT
+    return body[:index] + LIVERELOAD_SCRIPT + body[index:]
 
 
 class CORSHTTPRequestHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    livereload = None
+    cache = FileCache()
+    cache_control = "public, max-age=0, must-revalidate"
+
     def end_headers(self) -> None:
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
@@ -12,18 +136,139 @@ class CORSHTTPRequestHandler(SimpleHTTPRequestHandler):
 
     def do_OPTIONS(self):
         self.send_response(200, "OK")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.livereload is not None and self.path == LIVERELOAD_PATH:
+            self.send_events()
+            return
+        super().do_GET()
+
+    def send_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
         self.end_headers()
+        version = self.livereload.version
+        try:
+            while True:
+                current = self.livereload.wait(version, timeout=15)
+                self.wfile.write(b"data: reload\n\n" if current != version else b": ping\n\n")
+                self.wfile.flush()
+                version = current
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
 
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split("?", 1)[0].endswith("/"):
+            path = os.path.join(path, "index.html")
+        if path.endswith("/") or not os.path.isfile(path):
+            return super().send_head()
+
+        live = self.livereload is not None and path.endswith(".html")
+        encoding = None
+        body_path = path
+        if not live and is_compressible(path):
+            body_path, encoding = negotiate(path, self.headers.get("Accept-Encoding"))
+        try:
+            entry = self.cache.get(body_path, inject_livereload if live else None)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        if self.not_modified(entry):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_entry_headers(entry, live, path)
+            self.end_headers()
+            return None
+
+        start, end = 0, entry.size - 1
+        status = HTTPStatus.OK
+        if "Range" in self.headers and self.headers.get("If-Range", entry.etag) == entry.etag:
+            byte_range = parse_range(self.headers["Range"], entry.size)
+            if byte_range is False:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{entry.size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+            if byte_range is not None:
+                start, end = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        self.send_response(status)
+        self.send_entry_headers(entry, live, path)
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{entry.size}")
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if entry.data is not None:
+            return io.BytesIO(entry.data[start:end + 1] if status == HTTPStatus.PARTIAL_CONTENT else entry.data)
+        return FileRange(body_path, start, end - start + 1)
 
-def run(server_class=HTTPServer,
+    def not_modified(self, entry):
+        if "If-None-Match" in self.headers:
+            tags = [tag.strip() for tag in self.headers["If-None-Match"].split(",")]
+            return "*" in tags or entry.etag in tags
+        if "If-Modified-Since" in self.headers:
+            try:
+                since = email.utils.parsedate_to_datetime(self.headers["If-Modified-Since"])
+            except (TypeError, ValueError):
+                return False
+            return since is not None and int(since.timestamp()) >= entry.mtime_ns // 1_000_000_000
+        return False
+
+    def send_entry_headers(self, entry, live=False, path=""):
+        self.send_header("ETag", entry.etag)
+        if is_compressible(path):
+            self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Last-Modified", entry.last_modified)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Cache-Control", "no-store" if live else self.cache_control)
+
+    def copyfile(self, source, outputfile):
+        if isinstance(source, FileRange):
+            outputfile.flush()
+            self.connection.sendfile(source.file, source.offset, source.count)
+            return
+        super().copyfile(source, outputfile)
+
+
+def start_watch(directory, livereload, poll_interval):
+    from watch import LiveBuilder, watch
+
+    builder = LiveBuilder(public_dir=directory)
+    thread = threading.Thread(target=watch, args=(builder, livereload.notify, poll_interval), daemon=True)
+    thread.start()
+    return thread
+
+
+def run(server_class=ThreadingHTTPServer,
         handler_class=CORSHTTPRequestHandler,
         port=8000,
         directory=None,
+        watch=False,
+        poll_interval=0.1,
+        cache_mb=64,
+        max_age=0,
     ):
-    if directory:
-        os.chdir(directory)
+    directory = directory or "."
+    attrs = {
+        "cache": FileCache(max_bytes=cache_mb * 1024 * 1024),
+        "cache_control": f"public, max-age={max_age}" + (", must-revalidate" if max_age == 0 else ""),
+    }
+    if watch:
+        attrs["livereload"] = LiveReload()
+        start_watch(directory, attrs["livereload"], poll_interval)
+    handler_class = type(handler_class.__name__, (handler_class,), attrs)
     server_address = ("", port)
-    httpd = server_class(server_address, handler_class)
+    httpd = server_class(server_address, partial(handler_class, directory=directory))
     print(f"Serving HTTP on http://localhost:{port} from directory '{directory}'...")
     httpd.serve_forever()
 
@@ -34,6 +279,14 @@ if __name__ == "__main__":
         "--dir", type=str, help="Directory to serve files from", default=".",
     )
     parser.add_argument("--port", type=int, help="Port to serve HTTP on", default=8888)
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Rebuild changed pages from content/, static/ and template.html and live-reload browsers",
+    )
+    parser.add_argument("--poll-interval", type=float, help="Seconds between mtime scans in watch mode", default=0.1)
+    parser.add_argument("--cache-mb", type=int, help="Size cap of the in-memory file cache", default=64)
+    parser.add_argument("--max-age", type=int, help="Cache-Control max-age in seconds", default=0)
     args = parser.parse_args()
 
-    run(port=args.port, directory=args.dir)
+    run(port=args.port, directory=args.dir, watch=args.watch, poll_interval=args.poll_interval,
+        cache_mb=args.cache_mb, max_age=args.max_age)
@@ -0,0 +1,97 @@
+import os, shutil, sys
+
+from inventory import Inventory, scan_tree
+from manifest import hash_file
+from output import remove_output, replacing
+
+FICLONE = 0x40049409
+_reflink_supported = sys.platform.startswith("linux")
+
+
+class SyncResult:
+    def __init__(self) -> None:
+        self.assets = []
+        self.copied = 0
+        self.linked = 0
+        self.unchanged = 0
+        self.removed = 0
+
+    def __repr__(self) -> str:
+        return (f"SyncResult(copied={self.copied}, linked={self.linked}, "
+                f"unchanged={self.unchanged}, removed={self.removed})")
+
+
+def _reflink(source, target):
+    global _reflink_supported
+    if not _reflink_supported:
+        return False
+    import fcntl
+    try:
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        _reflink_supported = False
+        if os.path.exists(target):
+            os.remove(target)
+        return False
+    shutil.copystat(source, target)
+    return True
+
+
+def place_file(source, target, link=False):
+    linked = False
+    with replacing(target) as tmp_path:
+        if link:
+            try:
+                os.link(source, tmp_path)
+                linked = True
+            except OSError:
+                pass
+        if not linked and not _reflink(source, tmp_path):
+            shutil.copy2(source, tmp_path)
+    return linked
+
+
+def is_unchanged(source, target, source_stat, checksum=False):
+    try:
+        target_stat = os.stat(target)
+    except FileNotFoundError:
+        return False
+    if target_stat.st_size != source_stat.st_size:
+        return False
+    if target_stat.st_mtime_ns == source_stat.st_mtime_ns:
+        return True
+    if checksum and hash_file(source) == hash_file(target):
+        os.utime(target, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        return True
+    return False
+
+
+def sync_dir(source, target, previous_assets=(), exclude=(), link=False, checksum=False, inventory=None):
+    if inventory is None:
+        inventory = scan_tree(source) if os.path.isdir(source) else Inventory(source)
+    result = SyncResult()
+    made = set()
+    for entry in inventory:
+        target_path = os.path.normpath(os.path.join(target, entry.rel))
+        if target_path in exclude:
+            continue
+        result.assets.append(target_path)
+        if is_unchanged(entry.path, target_path, entry.stat, checksum):
+            result.unchanged += 1
+            continue
+        target_dir = os.path.dirname(target_path)
+        if target_dir not in made:
+            os.makedirs(target_dir, exist_ok=True)
+            made.add(target_dir)
+        if place_file(entry.path, target_path, link):
+            result.linked += 1
+        else:
+            result.copied += 1
+
+    current = set(result.assets)
+    for path in previous_assets:
+        if path not in current and path not in exclude and os.path.exists(path):
+            remove_output(path, target)
+            result.removed += 1
+    return result
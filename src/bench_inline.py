@@ -0,0 +1,91 @@
+import argparse
+import random
+import re
+import timeit
+
+from blocks import render_inline
+from corpus import WORDS, generate_inline
+from htmlnode import text_node_to_html_node
+from inline_cache import INLINE_CACHE, InlineCache
+from textnode import TextNode, extract_markdown_images, extract_markdown_links, has_inline_markup, split_nodes_delimiter
+
+LEGACY_IMAGE = r"!\[(.*?)\]\((.*?)\)"
+LEGACY_LINK = r"\[(.*?)\]\((.*?)\)"
+LEGACY_CACHE = InlineCache()
+
+
+def legacy_extract(text):
+    return re.findall(LEGACY_IMAGE, text), re.findall(LEGACY_LINK, text)
+
+
+def fast_extract(text):
+    return extract_markdown_images(text), extract_markdown_links(text)
+
+
+def legacy_split(old_nodes, pattern, prefix, text_type):
+    new_nodes = []
+    for node in old_nodes:
+        matches = re.findall(pattern, node.text)
+        if not matches:
+            new_nodes.append(node)
+            continue
+        rest = node.text
+        for label, url in matches:
+            before, rest = rest.split(f"{prefix}[{label}]({url})", 1)
+            if before:
+                new_nodes.append(TextNode(before, "text"))
+            new_nodes.append(TextNode(label, text_type, url))
+        if rest:
+            new_nodes.append(TextNode(rest, "text"))
+    return new_nodes
+
+
+def legacy_text_to_textnodes(text):
+    nodes = [TextNode(text, "text")]
+    for text_type, delimiter in zip(["bold", "italic", "code"], ["**", "*", "`"]):
+        nodes = split_nodes_delimiter(nodes, delimiter, text_type)
+    nodes = legacy_split(nodes, LEGACY_IMAGE, "!", "image")
+    return legacy_split(nodes, LEGACY_LINK, "", "link")
+
+
+def legacy_render_inline(text):
+    html = LEGACY_CACHE.get(text)
+    if html is None:
+        html = "".join([text_node_to_html_node(child).to_html() for child in legacy_text_to_textnodes(text)])
+        LEGACY_CACHE.put(text, html)
+    return html
+
+
+def best_of(fn, paragraphs, repeat):
+    def run():
+        INLINE_CACHE.clear()
+        LEGACY_CACHE.clear()
+        for text in paragraphs:
+            fn(text)
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of inline scanning on prose-heavy paragraphs")
+    parser.add_argument("-n", "--paragraphs", type=int, default=20_000, help="Number of paragraphs to scan")
+    parser.add_argument("--words", type=int, default=60, help="Words per paragraph")
+    parser.add_argument("--inline-density", type=float, default=0.003, help="Fraction of words wrapped in inline markup")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    paragraphs = [rng.choice(WORDS).capitalize() + " " + generate_inline(rng, args.words, args.inline_density)
+                  for _ in range(args.paragraphs)]
+    plain = sum(1 for text in paragraphs if not has_inline_markup(text))
+    print(f"{len(paragraphs)} paragraphs, {plain / len(paragraphs):.0%} without inline markup")
+
+    for name, legacy, fast in (("extract links/images", legacy_extract, fast_extract),
+                               ("render_inline", legacy_render_inline, render_inline)):
+        before = best_of(legacy, paragraphs, args.repeat)
+        after = best_of(fast, paragraphs, args.repeat)
+        print(f"  {name:<22}{before * 1000:9.1f} ms -> {after * 1000:9.1f} ms  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import tracemalloc
+
+from htmlnode import text_node_to_html_node
+from textnode import TextNode
+
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictLeafNode:
+    def __init__(self, tag=None, value=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+
+def dict_text_node_to_html_node(text_node):
+    if text_node.text_type == "image":
+        return DictLeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+    if text_node.text_type == "link":
+        return DictLeafNode("a", text_node.text, {"href": text_node.url})
+    return DictLeafNode("b", text_node.text)
+
+
+SPANS = [("bold text", "bold", None), ("a link", "link", "/majesty"), ("an image", "image", "/images/rivendell.png")]
+
+
+def measure(text_node_class, convert, count):
+    spans = [SPANS[i % len(SPANS)] for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    nodes = [(node, convert(node)) for node in (text_node_class(*span) for span in spans)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del nodes
+    return allocated / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-node memory cost of the TextNode -> HTMLNode tree")
+    parser.add_argument("-n", "--count", type=int, default=100_000, help="Number of inline spans to allocate")
+    args = parser.parse_args()
+
+    legacy = measure(DictTextNode, dict_text_node_to_html_node, args.count)
+    slotted = measure(TextNode, text_node_to_html_node, args.count)
+    print(f"dict-based nodes: {legacy:8.1f} bytes per span")
+    print(f"slotted nodes:    {slotted:8.1f} bytes per span")
+    print(f"saved:            {legacy - slotted:8.1f} bytes per span ({(1 - slotted / legacy) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
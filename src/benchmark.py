@@ -0,0 +1,144 @@
+import argparse, json, os, platform, shutil, sys, tempfile, time, tracemalloc
+
+from blocks import iter_blocks, markdown_to_html_node
+from corpus import CorpusOptions, write_corpus
+from inline_cache import INLINE_CACHE
+from main import build
+from textnode import text_to_textnodes
+
+
+def inline_texts(blocks):
+    return [block for block, block_type in blocks if block_type == "paragraph"]
+
+
+def run_stage(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        INLINE_CACHE.clear()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    INLINE_CACHE.clear()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def benchmark(pages, options, repeat=3, jobs=1):
+    root = tempfile.mkdtemp(prefix="ssg-bench-")
+    try:
+        content_dir = os.path.join(root, "content")
+        static_dir = os.path.join(root, "static")
+        template_path = os.path.join(root, "template.html")
+        os.makedirs(static_dir)
+        with open(template_path, 'w') as f:
+            f.write("<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>")
+
+        sources = []
+        for path in write_corpus(content_dir, pages, options):
+            with open(path, 'r') as f:
+                sources.append(f.read())
+        source_bytes = sum(len(source.encode()) for source in sources)
+        blocks = [list(iter_blocks(source)) for source in sources]
+        paragraphs = [text for page in blocks for text in inline_texts(page)]
+        trees = [markdown_to_html_node(source) for source in sources]
+
+        def full_build():
+            build(content_dir, static_dir, template_path, os.path.join(root, "public"),
+                  os.path.join(root, "cache"), full=True, jobs=jobs)
+
+        def noop_build():
+            build(content_dir, static_dir, template_path, os.path.join(root, "public"),
+                  os.path.join(root, "cache"), jobs=jobs)
+
+        stages = {
+            "markdown_to_blocks": lambda: [list(iter_blocks(source)) for source in sources],
+            "text_to_textnodes": lambda: [text_to_textnodes(text) for text in paragraphs],
+            "markdown_to_html_node": lambda: [markdown_to_html_node(source) for source in sources],
+            "to_html": lambda: [tree.to_html() for tree in trees],
+            "full_build": full_build,
+            "noop_build": noop_build,
+        }
+        results = {}
+        for name, fn in stages.items():
+            seconds, peak = run_stage(fn, repeat)
+            results[name] = {
+                "seconds": seconds,
+                "pages_per_s": pages / seconds if seconds else None,
+                "mb_per_s": source_bytes / seconds / 1e6 if seconds else None,
+                "peak_kb": peak / 1024,
+            }
+        return {
+            "pages": pages,
+            "source_mb": source_bytes / 1e6,
+            "options": options.to_dict(),
+            "python": platform.python_version(),
+            "stages": results,
+        }
+    finally:
+        shutil.rmtree(root)
+
+
+def compare(report, baseline, threshold):
+    regressions = []
+    for name, stage in report["stages"].items():
+        old = baseline["stages"].get(name)
+        if not old:
+            continue
+        change = (stage["seconds"] - old["seconds"]) / old["seconds"] * 100
+        marker = ""
+        if change > threshold:
+            marker = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<24}{old['seconds'] * 1000:10.1f} ms -> {stage['seconds'] * 1000:10.1f} ms  {change:+6.1f}%{marker}")
+    return regressions
+
+
+def print_report(report):
+    print(f"{report['pages']} pages, {report['source_mb']:.2f} MB of markdown (python {report['python']})")
+    print(f"  {'stage':<24}{'time':>10}   {'pages/s':>10}{'MB/s':>10}{'peak':>12}")
+    for name, stage in report["stages"].items():
+        print(f"  {name:<24}{stage['seconds'] * 1000:10.1f} ms{stage['pages_per_s']:10.0f}"
+              f"{stage['mb_per_s']:10.2f}{stage['peak_kb']:9.0f} KiB")
+
+
+def main():
+    defaults = CorpusOptions()
+    parser = argparse.ArgumentParser(description="Benchmark the markdown -> HTML pipeline on a synthetic corpus")
+    parser.add_argument("-n", "--pages", type=int, default=200, help="Number of pages to generate")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--inline-density", type=float, default=defaults.inline_density, help="Fraction of words wrapped in inline markup")
+    parser.add_argument("--list-ratio", type=float, default=defaults.list_ratio, help="Fraction of blocks that are lists")
+    parser.add_argument("--code-ratio", type=float, default=defaults.code_ratio, help="Fraction of blocks that are code")
+    parser.add_argument("--blocks", type=int, default=defaults.blocks_per_page, help="Blocks per page")
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="Directory nesting depth of the content tree")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (best is kept)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes for the build stages")
+    parser.add_argument("--save", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", help="Compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Slowdown in percent reported as a regression")
+    args = parser.parse_args()
+
+    options = CorpusOptions(seed=args.seed, inline_density=args.inline_density, list_ratio=args.list_ratio,
+                            code_ratio=args.code_ratio, blocks_per_page=args.blocks, depth=args.depth)
+    report = benchmark(args.pages, options, args.repeat, args.jobs)
+    print_report(report)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get("options") != report["options"] or baseline.get("pages") != report["pages"]:
+            print("warning: baseline was recorded with a different corpus")
+        print(f"compared to {args.compare}:")
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
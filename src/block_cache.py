@@ -0,0 +1,121 @@
+import hashlib, os, sqlite3, time
+
+from manifest import GENERATOR_VERSION
+
+_active = None
+
+
+class BlockCache:
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, flush_every=500) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.flush_every = flush_every
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS blocks (key TEXT PRIMARY KEY, html TEXT NOT NULL, "
+            "size INTEGER NOT NULL, used INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS blocks_used ON blocks (used)")
+        self.conn.commit()
+        self.pending = {}
+        self.touched = set()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(block, block_type):
+        return hashlib.blake2b(f"{GENERATOR_VERSION}\0{block_type}\0{block}".encode(), digest_size=16).hexdigest()
+
+    def get_many(self, keys):
+        found = {key: self.pending[key] for key in keys if key in self.pending}
+        missing = [key for key in keys if key not in found]
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT key, html FROM blocks WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update(rows)
+        self.hits += len(found)
+        self.misses += len(set(keys)) - len(found)
+        self.touched.update(found)
+        return found
+
+    def put(self, key, html):
+        self.pending[key] = html
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        now = int(time.time())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO blocks (key, html, size, used) VALUES (?, ?, ?, ?)",
+                [(key, html, len(html), now) for key, html in self.pending.items()],
+            )
+            self.conn.executemany("UPDATE blocks SET used = ? WHERE key = ?", [(now, key) for key in self.touched])
+        self.pending.clear()
+        self.touched.clear()
+
+    def total_bytes(self):
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blocks").fetchone()[0]
+
+    def evict(self):
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        rows = self.conn.execute("SELECT key, size FROM blocks ORDER BY used ASC").fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= size
+            evicted += 1
+        with self.conn:
+            self.conn.executemany("DELETE FROM blocks WHERE key = ?", doomed)
+        return evicted
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def close(self):
+        self.flush()
+        self.evict()
+        self.conn.close()
+
+    def __repr__(self) -> str:
+        return f"BlockCache(path={self.path}, {self.stats()})"
+
+
+def open_cache(path, max_bytes=256 * 1024 * 1024):
+    global _active
+    if _active is not None and _active.path == path:
+        return _active
+    if _active is not None:
+        _active.close()
+    _active = BlockCache(path, max_bytes)
+    return _active
+
+
+def close_cache():
+    global _active
+    cache, _active = _active, None
+    if cache is not None:
+        cache.close()
+    return cache
+
+
+def active():
+    return _active
+
+
+def clear_cache(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
@@ -1,42 +1,118 @@
+import io, json
+from itertools import islice
+
 from block_types import *
-from htmlnode import HTMLNode, ParentNode, text_node_to_html_node
-from textnode import text_to_textnodes
+from htmlnode import HTMLNode, LeafNode, ParentNode, text_node_to_html_node
+from inline_cache import INLINE_CACHE
+import block_cache
+from search import tokenize
+from textnode import has_inline_markup, text_to_textnodes
+import profiler
+
+
+def iter_blocks(lines):
+    for _, block, block_type in iter_numbered_blocks(lines):
+        yield block, block_type
+
+
+def iter_numbered_blocks(lines, first_line=1):
+    if isinstance(lines, str):
+        lines = lines.split("\n")
+    block = []
+    start = first_line
+    in_fence = False
+    for number, line in enumerate(lines, first_line):
+        line = line.rstrip("\r\n")
+        if in_fence:
+            block.append(line)
+            if line.rstrip().endswith("```"):
+                in_fence = False
+                yield (start,) + finish_block(block)
+                block = []
+            continue
+        stripped = line.strip()
+        if not stripped:
+            if block:
+                yield (start,) + finish_block(block)
+                block = []
+            continue
+        if stripped.startswith("```") and not (len(stripped) >= 6 and stripped.endswith("```")):
+            if block:
+                yield (start,) + finish_block(block)
+                block = []
+            in_fence = True
+        if not block:
+            start = number
+        block.append(line)
+    if block:
+        yield (start,) + finish_block(block)
+
+
+def finish_block(lines):
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    block = "\n".join(lines)
+    return block, classify_block(block, lines)
 
 
 def markdown_to_blocks(markdown):
-    uncleaned_blocks = markdown.split("\n\n")
-    cleaned_blocks = [block.strip() for block in uncleaned_blocks]
-    return [block for block in cleaned_blocks if block != '']
+    return [block for block, _ in iter_blocks(markdown)]
 
 
-def block_to_block_type(block):
-    if block.startswith("#"):
-        start = block.split(" ")[0]
-        if len(start) <= 6 and all([l == "#" for l in start]):
+def classify_block(block, lines):
+    first = lines[0]
+    if first.startswith("#"):
+        level = len(first) - len(first.lstrip("#"))
+        if level <= 6 and first[level:level + 1] == " ":
             return block_type_heading
     if block.startswith('```') and block.endswith('```'):
         return block_type_code
-    lines = block.split("\n")
-    if all([line.startswith(">") for line in lines]):
+    quote = True
+    ul = True
+    ol = first.startswith("1.")
+    for number, line in enumerate(lines, 1):
+        if quote and not line.startswith(">"):
+            quote = False
+        if ul and line[:1] not in ('-', '*'):
+            ul = False
+        if ol and not line.startswith(f"{number}."):
+            ol = False
+        if not (quote or ul or ol):
+            return block_type_paragraph
+    if quote:
         return block_type_quote
-    if all([line[0] in ['-', '*'] for line in lines]):
+    if ul:
         return block_type_unordered_list
-    if lines[0][:2] == '1.':
-        ol = True
-        current = 1
-        for line in lines:
-            if not line.startswith(str(current)+"."):
-                ol = False
-                break
-            current += 1
-        if ol:
-            return block_type_ordered_list
-    return block_type_paragraph
+    return block_type_ordered_list
+
+
+def block_to_block_type(block):
+    return classify_block(block, block.split("\n"))
+
+
+_inline_sink = None
+
+
+def render_inline(text):
+    if not has_inline_markup(text):
+        if _inline_sink is not None:
+            _inline_sink.append((text, text, ()))
+        return text
+    entry = INLINE_CACHE.get(text)
+    if entry is None:
+        with profiler.stage("text_to_textnodes"):
+            children = text_to_textnodes(text)
+        html = "".join([text_node_to_html_node(child).to_html() for child in children])
+        links = [[child.text_type, child.url] for child in children if child.text_type in ("image", "link")]
+        entry = [html, "".join([child.text for child in children]), links]
+        INLINE_CACHE.put(text, entry)
+    if _inline_sink is not None:
+        _inline_sink.append(entry)
+    return entry[0]
 
 
 def text_to_html_nodes(text):
-    children = text_to_textnodes(text)
-    return [text_node_to_html_node(child) for child in children]
+    return [LeafNode(None, render_inline(text))]
 
 
 def heading_to_html_node(heading_block):
@@ -86,9 +162,99 @@ block_type_to_parser = {
 
 
 def markdown_to_html_node(markdown):
-    children = []
-    blocks = markdown_to_blocks(markdown)
-    block_types = [block_to_block_type(block) for block in blocks]
-    for block, block_type in zip(blocks, block_types):
-        children.append(block_type_to_parser[block_type](block))
+    with profiler.stage("markdown_to_blocks"):
+        blocks = list(iter_blocks(markdown))
+    with profiler.stage("blocks_to_html_nodes"):
+        children = [node for node, _, _ in render_blocks(blocks, block_cache.active())]
     return ParentNode(tag="div", children=children)
+
+
+def parse_block(block, block_type):
+    global _inline_sink
+    _inline_sink = sink = []
+    try:
+        node = block_type_to_parser[block_type](block)
+    finally:
+        _inline_sink = None
+    return node, "\n".join([entry[1] for entry in sink]), [link for entry in sink for link in entry[2]]
+
+
+def render_blocks(blocks, cache=None):
+    if cache is None:
+        return [parse_block(block, block_type) for block, block_type in blocks]
+    keys = [cache.key(block, block_type) for block, block_type in blocks]
+    found = cache.get_many(keys)
+    rendered = []
+    for (block, block_type), key in zip(blocks, keys):
+        value = found.get(key)
+        if value is None:
+            node, text, links = parse_block(block, block_type)
+            html = node.to_html()
+            found[key] = value = json.dumps([html, text, links])
+            cache.put(key, value)
+        else:
+            html, text, links = json.loads(value)
+        rendered.append((LeafNode(None, html), text, links))
+    return rendered
+
+
+def link_lines(block, line, links):
+    pos = 0
+    for kind, url in links:
+        found = block.find(f"]({url}", pos)
+        if found != -1:
+            pos = found + 1
+        yield [kind, url, line + block.count("\n", 0, pos)]
+
+
+class BlockStream:
+    __slots__ = ("path", "first_line", "batch_size", "terms", "text", "links", "pending")
+
+    def __init__(self, path, first_line=1, batch_size=64, terms=None, text=None, links=None) -> None:
+        self.path = path
+        self.first_line = first_line
+        self.batch_size = batch_size
+        self.terms = terms
+        self.text = text
+        self.links = links
+        self.pending = []
+
+    def to_html_chunks(self):
+        yield "<div>"
+        cache = block_cache.active()
+        size = self.batch_size if cache is not None else 1
+        with open(self.path, 'r') if self.text is None else io.StringIO(self.text) as f:
+            blocks = iter_numbered_blocks(islice(f, self.first_line - 1, None), self.first_line)
+            while True:
+                with profiler.stage("markdown_to_blocks"):
+                    batch = list(islice(blocks, size))
+                if not batch:
+                    break
+                yield from self.render_batch(batch, cache)
+        self.tokenize()
+        yield "</div>"
+
+    def tokenize(self):
+        if self.pending:
+            with profiler.stage("tokenize"):
+                tokenize("\n".join(self.pending), self.terms)
+            self.pending = []
+
+    def render_batch(self, blocks, cache):
+        with profiler.stage("blocks_to_html_nodes"):
+            rendered = render_blocks([(block, block_type) for _, block, block_type in blocks], cache)
+        for (line, block, _), (_, text, links) in zip(blocks, rendered):
+            if links and self.links is not None:
+                self.links.extend(link_lines(block, line, links))
+            if self.terms is not None:
+                self.pending.append(text)
+                if len(self.pending) >= self.batch_size:
+                    self.tokenize()
+        with profiler.stage("to_html"):
+            return [node.to_html() for node, _, _ in rendered]
+
+    def write_html(self, fp):
+        fp.writelines(self.to_html_chunks())
+
+    def __repr__(self) -> str:
+        return f"BlockStream({self.path})"
@@ -0,0 +1,111 @@
+import gzip, os
+from concurrent.futures import ThreadPoolExecutor
+
+from output import SIDECAR_SUFFIXES, atomic_write, sidecar_source
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {".html", ".css", ".js", ".json", ".xml", ".svg", ".txt", ".map"}
+MIN_SIZE = 256
+
+
+def encoders():
+    yield ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield ".br", lambda data: brotli.compress(data, quality=11)
+
+
+def is_compressible(path):
+    return os.path.splitext(path)[1] in COMPRESSIBLE_EXTENSIONS
+
+
+def compress_file(path):
+    stat = os.stat(path)
+    if stat.st_size < MIN_SIZE:
+        for suffix in SIDECAR_SUFFIXES:
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return 0
+    data = None
+    written = 0
+    for suffix, encode in encoders():
+        target = path + suffix
+        try:
+            if os.stat(target).st_mtime_ns == stat.st_mtime_ns:
+                continue
+        except FileNotFoundError:
+            pass
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        with atomic_write(target, 'wb') as f:
+            f.write(encode(data))
+        os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        written += 1
+    return written
+
+
+class CompressResult:
+    def __init__(self) -> None:
+        self.compressed = 0
+        self.skipped = 0
+        self.removed = 0
+
+    def __repr__(self) -> str:
+        return f"CompressResult(compressed={self.compressed}, skipped={self.skipped}, removed={self.removed})"
+
+
+def compress_outputs(dest_root, jobs=None):
+    result = CompressResult()
+    sources = []
+    for dirpath, _, filenames in os.walk(dest_root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            source = sidecar_source(path)
+            if source is not None:
+                if not os.path.exists(source) or not is_compressible(source):
+                    os.remove(path)
+                    result.removed += 1
+            elif is_compressible(path):
+                sources.append(path)
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        for written in pool.map(compress_file, sources):
+            if written:
+                result.compressed += 1
+            else:
+                result.skipped += 1
+    return result
+
+
+def parse_accept_encoding(header):
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def negotiate(path, accept_encoding):
+    accepted = parse_accept_encoding(accept_encoding or "")
+    for suffix, coding in ((".br", "br"), (".gz", "gzip")):
+        if accepted.get(coding, accepted.get("*", 0.0)) <= 0:
+            continue
+        candidate = path + suffix
+        try:
+            if os.stat(candidate).st_mtime_ns == os.stat(path).st_mtime_ns:
+                return candidate, coding
+        except FileNotFoundError:
+            continue
+    return path, None
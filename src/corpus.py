@@ -0,0 +1,96 @@
+import os, random
+
+WORDS = (
+    "the of and to in a is that for it as was with be by on not he this are or his from at which "
+    "but have an they you were her she there been one all we their has would when if so no what "
+    "ring shire elves dwarves mordor hobbit wizard fellowship journey mountain river forest king"
+).split()
+
+
+class CorpusOptions:
+    def __init__(self, seed=0, inline_density=0.1, list_ratio=0.2, code_ratio=0.1, quote_ratio=0.05,
+                 blocks_per_page=40, words_per_paragraph=60, depth=2, fanout=10) -> None:
+        self.seed = seed
+        self.inline_density = inline_density
+        self.list_ratio = list_ratio
+        self.code_ratio = code_ratio
+        self.quote_ratio = quote_ratio
+        self.blocks_per_page = blocks_per_page
+        self.words_per_paragraph = words_per_paragraph
+        self.depth = depth
+        self.fanout = fanout
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self) -> str:
+        return f"CorpusOptions({self.to_dict()})"
+
+
+def generate_inline(rng, words, inline_density):
+    parts = [rng.choice(WORDS)]
+    for _ in range(words - 1):
+        word = rng.choice(WORDS)
+        if rng.random() >= inline_density:
+            parts.append(word)
+            continue
+        kind = rng.randrange(5)
+        if kind == 0:
+            parts.append(f"**{word}**")
+        elif kind == 1:
+            parts.append(f"*{word}*")
+        elif kind == 2:
+            parts.append(f"`{word}()`")
+        elif kind == 3:
+            parts.append(f"[{word}](/{rng.choice(WORDS)}/{word})")
+        else:
+            parts.append(f"![{word}](/images/{word}.png)")
+    return " ".join(parts)
+
+
+def generate_block(rng, options):
+    roll = rng.random()
+    line_words = max(4, options.words_per_paragraph // 4)
+    if roll < options.code_ratio:
+        lines = [f"{rng.choice(WORDS)} = {rng.choice(WORDS)}({rng.randrange(100)})" for _ in range(rng.randint(2, 8))]
+        return "```\n" + "\n".join(lines) + "\n```"
+    roll -= options.code_ratio
+    if roll < options.list_ratio:
+        items = rng.randint(2, 8)
+        if rng.random() < 0.5:
+            return "\n".join(f"* {generate_inline(rng, line_words, options.inline_density)}" for _ in range(items))
+        return "\n".join(f"{i}. {generate_inline(rng, line_words, options.inline_density)}" for i in range(1, items + 1))
+    roll -= options.list_ratio
+    if roll < options.quote_ratio:
+        return "\n".join(f"> {generate_inline(rng, line_words, options.inline_density)}" for _ in range(rng.randint(1, 4)))
+    roll -= options.quote_ratio
+    if roll < 0.1:
+        return f"{'#' * rng.randint(2, 4)} {generate_inline(rng, 5, options.inline_density)}"
+    return generate_inline(rng, options.words_per_paragraph, options.inline_density)
+
+
+def generate_markdown(rng, title, options):
+    blocks = [f"# {title}"]
+    blocks.extend(generate_block(rng, options) for _ in range(options.blocks_per_page))
+    return "\n\n".join(blocks) + "\n"
+
+
+def page_path(index, options):
+    parts = []
+    for _ in range(options.depth):
+        parts.append(f"section{index % options.fanout}")
+        index //= options.fanout
+    return os.path.join(*parts) if parts else ""
+
+
+def write_corpus(content_dir, pages, options=None):
+    options = options or CorpusOptions()
+    rng = random.Random(options.seed)
+    paths = []
+    for i in range(pages):
+        path = os.path.join(content_dir, page_path(i, options), f"page{i}.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(generate_markdown(rng, f"Page {i}", options))
+        paths.append(path)
+    return paths
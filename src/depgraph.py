@@ -0,0 +1,57 @@
+import os
+
+from links import is_internal, resolve, site_path
+from manifest import hash_file
+
+TEMPLATE = "template"
+INCLUDE = "include"
+ASSET = "asset"
+
+
+def node(kind, path):
+    return f"{kind}:{os.path.normpath(path)}"
+
+
+def describe(node_id):
+    kind, _, path = node_id.partition(":")
+    return f"{kind} {path}"
+
+
+class Versions:
+    def __init__(self) -> None:
+        self.versions = {}
+
+    def get(self, node_id):
+        version = self.versions.get(node_id)
+        if version is None:
+            version = self.versions[node_id] = self.compute(node_id)
+        return version
+
+    @staticmethod
+    def compute(node_id):
+        kind, _, path = node_id.partition(":")
+        try:
+            if kind == ASSET:
+                stat = os.stat(path)
+                return f"{stat.st_size}:{stat.st_mtime_ns}"
+            return hash_file(path)
+        except FileNotFoundError:
+            return "missing"
+
+
+def page_dependencies(template_path, template, links, dest_path, public_dir, static_dir=None):
+    deps = {node(TEMPLATE, template_path)}
+    deps.update(node(INCLUDE, path) for path in template.includes)
+    if static_dir is not None:
+        page_path = site_path(dest_path, public_dir)
+        for _, url, _ in links:
+            if not is_internal(url):
+                continue
+            source = os.path.join(static_dir, *resolve(url, page_path).strip("/").split("/"))
+            if os.path.isfile(source):
+                deps.add(node(ASSET, source))
+    return sorted(deps)
+
+
+def changed_dependencies(deps, recorded, versions):
+    return [node_id for node_id in deps if recorded.get(node_id) != versions.get(node_id)]
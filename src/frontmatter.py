@@ -0,0 +1,97 @@
+import datetime
+
+FENCE = "---"
+
+
+def parse_value(raw):
+    raw = raw.strip()
+    if raw.startswith("[") and raw.endswith("]"):
+        return [parse_value(item) for item in raw[1:-1].split(",") if item.strip()]
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in "\"'":
+        return raw[1:-1]
+    lowered = raw.lower()
+    if lowered in ("true", "yes"):
+        return True
+    if lowered in ("false", "no"):
+        return False
+    return raw
+
+
+def read_front_matter(f):
+    first = f.readline()
+    if first.rstrip() != FENCE:
+        return {}, first, 1
+    meta = {}
+    key = None
+    number = 1
+    for line in f:
+        number += 1
+        stripped = line.strip()
+        if stripped == FENCE:
+            break
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and isinstance(meta.get(key), list):
+            meta[key].append(parse_value(stripped[2:]))
+            continue
+        key, sep, value = stripped.partition(":")
+        if not sep:
+            raise ValueError(f"Invalid front matter on line {number}: {stripped}")
+        key = key.strip().lower()
+        meta[key] = parse_value(value) if value.strip() else []
+    else:
+        raise ValueError("Front matter is not closed with ---")
+    for line in f:
+        number += 1
+        if line.strip():
+            return meta, line, number
+    return meta, "", number + 1
+
+
+class PageInfo:
+    __slots__ = ("source", "dest", "meta", "heading", "body_line")
+
+    def __init__(self, source, dest, meta=None, heading="", body_line=1) -> None:
+        self.source = source
+        self.dest = dest
+        self.meta = meta if meta is not None else {}
+        self.heading = heading
+        self.body_line = body_line
+
+    @property
+    def title(self):
+        if self.meta.get("title"):
+            return str(self.meta["title"])
+        if self.heading.startswith("# "):
+            return self.heading.strip()[2:]
+        return None
+
+    @property
+    def date(self):
+        value = self.meta.get("date")
+        if not value:
+            return None
+        try:
+            return datetime.date.fromisoformat(str(value)[:10])
+        except ValueError:
+            return None
+
+    @property
+    def tags(self):
+        tags = self.meta.get("tags", [])
+        if isinstance(tags, str):
+            tags = tags.split(",")
+        return [str(tag).strip() for tag in tags if str(tag).strip()]
+
+    @property
+    def draft(self):
+        return self.meta.get("draft") is True
+
+    def __repr__(self) -> str:
+        return f"PageInfo({self.source}, title={self.title}, date={self.date}, tags={self.tags}, draft={self.draft})"
+
+
+def scan_page(source, dest):
+    with open(source, 'r') as f:
+        meta, heading, body_line = read_front_matter(f)
+    return PageInfo(source, dest, meta, heading, body_line)
@@ -1,4 +1,6 @@
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None) -> None:
         self.tag = tag
         self.value = value
@@ -8,19 +10,35 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError()
 
+    def to_html_chunks(self):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if type(node) is str:
+                yield node
+            elif isinstance(node, ParentNode):
+                node.validate()
+                yield f"<{node.tag}{node.props_to_html()}>"
+                stack.append(f"</{node.tag}>")
+                stack.extend(reversed(node.children))
+            else:
+                yield node.to_html()
+
+    def write_html(self, fp):
+        fp.writelines(self.to_html_chunks())
+
     def props_to_html(self):
         if not self.props:
             return ""
-        res = ""
-        for key, val in self.props.items():
-            res += f' {key}="{val}"'
-        return res
+        return "".join([f' {key}="{val}"' for key, val in self.props.items()])
 
     def __repr__(self) -> str:
         return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, value=None, props=None) -> None:
         super().__init__(tag, value, None, props)
 
@@ -35,15 +53,19 @@ class LeafNode(HTMLNode):
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None) -> None:
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def validate(self):
         if not self.tag:
             raise ValueError("Parent nodes must have a tag")
         if not self.children:
             raise ValueError("Parent nodes must have children")
-        return f"<{self.tag}{self.props_to_html()}>{''.join([child.to_html() for child in self.children])}</{self.tag}>"
+
+    def to_html(self):
+        return "".join(self.to_html_chunks())
 
 
 TEXT_TYPE_TO_HTML_TAG = {
@@ -56,16 +78,67 @@ TEXT_TYPE_TO_HTML_TAG = {
 }
 
 
+class LinkNode(LeafNode):
+    __slots__ = ("url", "_props")
+
+    def __init__(self, value, url) -> None:
+        self.tag = "a"
+        self.value = value
+        self.children = None
+        self.url = url
+        self._props = None
+
+    @property
+    def props(self):
+        if self._props is None:
+            self._props = {"href": self.url}
+        return self._props
+
+    @props.setter
+    def props(self, props):
+        self._props = props
+
+    def props_to_html(self):
+        if self._props is None:
+            return f' href="{self.url}"'
+        return super().props_to_html()
+
+
+class ImageNode(LeafNode):
+    __slots__ = ("url", "alt", "_props")
+
+    def __init__(self, url, alt) -> None:
+        self.tag = "img"
+        self.value = ""
+        self.children = None
+        self.url = url
+        self.alt = alt
+        self._props = None
+
+    @property
+    def props(self):
+        if self._props is None:
+            self._props = {"src": self.url, "alt": self.alt}
+        return self._props
+
+    @props.setter
+    def props(self, props):
+        self._props = props
+
+    def props_to_html(self):
+        if self._props is None:
+            return f' src="{self.url}" alt="{self.alt}"'
+        return super().props_to_html()
+
+
 def text_node_to_html_node(text_node):
-    if text_node.text_type not in TEXT_TYPE_TO_HTML_TAG.keys():
+    if text_node.text_type not in TEXT_TYPE_TO_HTML_TAG:
         raise ValueError(f"{text_node.text_type} is not a valid type")
     tag = TEXT_TYPE_TO_HTML_TAG[text_node.text_type]
-    value = text_node.text
-    props = None
-    if text_node.url:
-        if tag == "img":
-            props = {"src": text_node.url, "alt": value}
-            value = ""
-        else:
-            props = {"href": text_node.url}
-    return LeafNode(tag, value, props)
+    if not text_node.url:
+        return LeafNode(tag, text_node.text)
+    if tag == "img":
+        return ImageNode(text_node.url, text_node.text)
+    if tag == "a":
+        return LinkNode(text_node.text, text_node.url)
+    return LeafNode(tag, text_node.text, {"href": text_node.url})
@@ -0,0 +1,92 @@
+import json, os
+from collections import OrderedDict
+
+from manifest import GENERATOR_VERSION
+from output import atomic_write
+
+
+class InlineCache:
+    def __init__(self, max_entries=50_000, max_text_length=1024) -> None:
+        self.max_entries = max_entries
+        self.max_text_length = max_text_length
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.added = None
+
+    def get(self, text):
+        html = self.entries.get(text)
+        if html is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(text)
+        return html
+
+    def put(self, text, html):
+        if len(text) > self.max_text_length:
+            return
+        self.entries[text] = html
+        if self.added is not None:
+            self.added[text] = html
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def track(self, entries=True):
+        self.added = {} if entries else None
+        self.hits = 0
+        self.misses = 0
+
+    def drain(self):
+        added = list(self.added.items()) if self.added else []
+        if self.added:
+            self.added.clear()
+        counts = self.hits, self.misses
+        self.hits = 0
+        self.misses = 0
+        return added, counts
+
+    def merge(self, added, counts=(0, 0)):
+        for text, html in added:
+            self.put(text, html)
+        self.hits += counts[0]
+        self.misses += counts[1]
+
+    def clear(self):
+        self.entries.clear()
+        if self.added is not None:
+            self.added.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def load(self, path):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != GENERATOR_VERSION:
+            return False
+        for text, html in data.get("entries", [])[-self.max_entries:]:
+            self.entries[text] = html
+        return True
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with atomic_write(path) as f:
+            json.dump({"version": GENERATOR_VERSION, "entries": list(self.entries.items())}, f)
+
+    def __repr__(self) -> str:
+        return f"InlineCache({self.stats()})"
+
+
+INLINE_CACHE = InlineCache()
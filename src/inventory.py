@@ -0,0 +1,62 @@
+import os
+
+
+class FileEntry:
+    __slots__ = ("path", "rel", "stat")
+
+    def __init__(self, path, rel, stat) -> None:
+        self.path = path
+        self.rel = rel
+        self.stat = stat
+
+    @property
+    def size(self):
+        return self.stat.st_size
+
+    @property
+    def mtime_ns(self):
+        return self.stat.st_mtime_ns
+
+    def __repr__(self) -> str:
+        return f"FileEntry({self.rel}, size={self.size}, mtime_ns={self.mtime_ns})"
+
+
+class Inventory:
+    def __init__(self, root, files=None, dirs=None) -> None:
+        self.root = os.path.normpath(root)
+        self.files = files if files is not None else []
+        self.dirs = dirs if dirs is not None else []
+        self.by_path = {entry.path: entry for entry in self.files}
+
+    def get(self, path):
+        return self.by_path.get(path)
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __repr__(self) -> str:
+        return f"Inventory({self.root}, files={len(self.files)}, dirs={len(self.dirs)})"
+
+
+def _walk(path, rel, files, dirs):
+    with os.scandir(path) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    for entry in entries:
+        entry_rel = os.path.join(rel, entry.name) if rel else entry.name
+        try:
+            if entry.is_dir():
+                dirs.append(entry_rel)
+                _walk(entry.path, entry_rel, files, dirs)
+            elif entry.is_file():
+                files.append(FileEntry(os.path.normpath(entry.path), entry_rel, entry.stat()))
+        except FileNotFoundError:
+            continue
+
+
+def scan_tree(root):
+    files, dirs = [], []
+    _walk(root, "", files, dirs)
+    return Inventory(root, files, dirs)
@@ -0,0 +1,77 @@
+import json, os, posixpath, re
+from urllib.parse import unquote
+
+from output import atomic_write
+
+EXTERNAL = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*:|//|[?#]|$")
+
+
+def is_internal(url):
+    return EXTERNAL.match(url) is None
+
+
+def site_path(path, public_dir):
+    return "/" + os.path.relpath(path, public_dir).replace(os.sep, "/")
+
+
+def resolve(url, page_path):
+    path = url.partition("#")[0].partition("?")[0]
+    if "%" in path:
+        path = unquote(path)
+    if not path.startswith("/"):
+        path = posixpath.join(posixpath.dirname(page_path), path)
+    return posixpath.normpath(path)
+
+
+def target_exists(path, known):
+    if path == "/":
+        return "/index.html" in known
+    return path in known or path + ".html" in known or path.rstrip("/") + "/index.html" in known
+
+
+class BrokenLink:
+    __slots__ = ("source", "line", "kind", "url")
+
+    def __init__(self, source, line, kind, url) -> None:
+        self.source = source
+        self.line = line
+        self.kind = kind
+        self.url = url
+
+    def __str__(self) -> str:
+        return f"{self.source}:{self.line}: broken {self.kind} {self.url}"
+
+    def __repr__(self) -> str:
+        return f"BrokenLink({self.source}, {self.line}, {self.kind}, {self.url})"
+
+
+def check_links(pages, assets, public_dir):
+    known = {site_path(page["dest"], public_dir) for page in pages.values()}
+    known.update(site_path(asset, public_dir) for asset in assets)
+    broken = []
+    valid = {}
+    for source, page in sorted(pages.items()):
+        page_path = site_path(page["dest"], public_dir)
+        directory = posixpath.dirname(page_path)
+        for kind, url, line in page.get("links", ()):
+            key = (directory, url)
+            ok = valid.get(key)
+            if ok is None:
+                ok = valid[key] = not is_internal(url) or target_exists(resolve(url, page_path), known)
+            if not ok:
+                broken.append(BrokenLink(source, line, kind, url))
+    return broken
+
+
+def write_index(path, pages, public_dir, broken):
+    index = {
+        "fields": {"links": ["kind", "url", "line"], "broken": ["source", "line", "kind", "url"]},
+        "pages": {
+            site_path(page["dest"], public_dir): {"source": source, "links": page.get("links", [])}
+            for source, page in sorted(pages.items())
+        },
+        "broken": [[link.source, link.line, link.kind, link.url] for link in broken],
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with atomic_write(path) as f:
+        f.write(json.dumps(index, separators=(",", ":")))
@@ -0,0 +1,223 @@
+import datetime, hashlib, os, re
+from xml.sax.saxutils import escape
+from email.utils import format_datetime
+
+from manifest import GENERATOR_VERSION
+from output import remove_output, write_if_changed
+from template import build_date
+
+SITEMAP_SHARD_SIZE = 50_000
+FEED_SIZE = 20
+PAGE_SIZE = 50
+
+
+def page_url(dest_path, public_dir):
+    url = "/" + os.path.relpath(dest_path, public_dir).replace(os.sep, "/")
+    if url.endswith("/index.html"):
+        url = url[:-len("index.html")]
+    return url
+
+
+def slugify(tag):
+    return re.sub(r"[^a-z0-9]+", "-", tag.lower()).strip("-") or "tag"
+
+
+class Entry:
+    __slots__ = ("url", "title", "date", "tags")
+
+    def __init__(self, url, title, date, tags) -> None:
+        self.url = url
+        self.title = title
+        self.date = date
+        self.tags = tags
+
+    def key(self):
+        return f"{self.url}\0{self.title}\0{self.date}"
+
+    def __repr__(self) -> str:
+        return f"Entry({self.url}, {self.title}, {self.date})"
+
+
+def newest_first(entries):
+    return sorted(entries, key=lambda entry: (entry.date or datetime.date.min, entry.url), reverse=True)
+
+
+class ListingContent:
+    __slots__ = ("heading", "entries", "number", "count", "base_url")
+
+    def __init__(self, heading, entries, number=1, count=1, base_url="") -> None:
+        self.heading = heading
+        self.entries = entries
+        self.number = number
+        self.count = count
+        self.base_url = base_url
+
+    def to_html_chunks(self):
+        yield f"<div><h1>{escape(self.heading)}</h1><ul>"
+        for entry in self.entries:
+            date = f" <time datetime=\"{entry.date}\">{entry.date}</time>" if entry.date else ""
+            yield f"<li><a href=\"{entry.url}\">{escape(entry.title)}</a>{date}</li>"
+        yield "</ul>"
+        if self.count > 1:
+            yield "<nav>"
+            if self.number > 1:
+                yield f"<a href=\"{listing_url(self.base_url, self.number - 1)}\" rel=\"prev\">Newer</a>"
+            yield f" Page {self.number} of {self.count} "
+            if self.number < self.count:
+                yield f"<a href=\"{listing_url(self.base_url, self.number + 1)}\" rel=\"next\">Older</a>"
+            yield "</nav>"
+        yield "</div>"
+
+
+def listing_url(base_url, number):
+    return base_url if number == 1 else f"{base_url}page/{number}/"
+
+
+def listing_path(public_dir, base_url, number):
+    return os.path.join(public_dir, *listing_url(base_url, number).strip("/").split("/"), "index.html")
+
+
+class Listing:
+    __slots__ = ("path", "key", "chunks")
+
+    def __init__(self, path, key, chunks) -> None:
+        self.path = os.path.normpath(path)
+        self.key = key
+        self.chunks = chunks
+
+    def fingerprint(self):
+        h = hashlib.sha256(GENERATOR_VERSION.encode())
+        for part in self.key():
+            h.update(part.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+
+def sitemap_listings(entries, public_dir, site_url):
+    entries = sorted(entries, key=lambda entry: entry.url)
+    shards = [entries[start:start + SITEMAP_SHARD_SIZE] for start in range(0, len(entries), SITEMAP_SHARD_SIZE)]
+
+    def urlset(shard):
+        def chunks():
+            yield '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            for entry in shard:
+                lastmod = f"<lastmod>{entry.date}</lastmod>" if entry.date else ""
+                yield f"<url><loc>{escape(site_url + entry.url)}</loc>{lastmod}</url>\n"
+            yield "</urlset>\n"
+        return chunks
+
+    if len(shards) <= 1:
+        chunks = urlset(shards[0] if shards else [])
+        yield Listing(os.path.join(public_dir, "sitemap.xml"), chunks, chunks)
+        return
+
+    names = [f"sitemap-{number}.xml" for number in range(1, len(shards) + 1)]
+
+    def index():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        for name in names:
+            yield f"<sitemap><loc>{escape(site_url)}/{name}</loc></sitemap>\n"
+        yield "</sitemapindex>\n"
+
+    yield Listing(os.path.join(public_dir, "sitemap.xml"), index, index)
+    for name, shard in zip(names, shards):
+        chunks = urlset(shard)
+        yield Listing(os.path.join(public_dir, name), chunks, chunks)
+
+
+def feed_listing(entries, public_dir, site_url, site_title):
+    latest = newest_first([entry for entry in entries if entry.date])[:FEED_SIZE]
+
+    def chunks():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>\n'
+        yield f"<title>{escape(site_title)}</title><link>{escape(site_url)}/</link><description>{escape(site_title)}</description>\n"
+        for entry in latest:
+            published = datetime.datetime.combine(entry.date, datetime.time(), datetime.timezone.utc)
+            link = escape(site_url + entry.url)
+            yield (f"<item><title>{escape(entry.title)}</title><link>{link}</link><guid>{link}</guid>"
+                   f"<pubDate>{format_datetime(published)}</pubDate></item>\n")
+        yield "</channel></rss>\n"
+
+    return Listing(os.path.join(public_dir, "feed.xml"), chunks, chunks)
+
+
+def tag_listings(entries, public_dir, template, template_hash):
+    tags = {}
+    for entry in entries:
+        for tag in entry.tags:
+            tags.setdefault(slugify(tag), (tag, []))[1].append(entry)
+
+    def page(heading, base_url, number, count, chunk):
+        content = ListingContent(heading, chunk, number, count, base_url)
+
+        def key():
+            yield template_hash
+            yield f"{heading}\0{number}\0{count}"
+            for entry in chunk:
+                yield entry.key()
+
+        def chunks():
+            return template.render_chunks({"Title": escape(heading), "Content": content, "Date": build_date()})
+
+        return Listing(listing_path(public_dir, base_url, number), key, chunks)
+
+    summary = [Entry(f"/tags/{slug}/", f"{tag} ({len(tagged)})", None, ()) for slug, (tag, tagged) in sorted(tags.items())]
+    if summary:
+        yield page("Tags", "/tags/", 1, 1, summary)
+    for slug, (tag, tagged) in sorted(tags.items()):
+        tagged = newest_first(tagged)
+        count = (len(tagged) + PAGE_SIZE - 1) // PAGE_SIZE
+        for number in range(1, count + 1):
+            chunk = tagged[(number - 1) * PAGE_SIZE:number * PAGE_SIZE]
+            yield page(f"Tagged {tag}", f"/tags/{slug}/", number, count, chunk)
+
+
+class ListingResult:
+    def __init__(self) -> None:
+        self.outputs = {}
+        self.written = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.skipped = 0
+
+    def __repr__(self) -> str:
+        return (f"ListingResult(written={self.written}, unchanged={self.unchanged}, removed={self.removed}, "
+                f"skipped={self.skipped})")
+
+
+def write_listing(listing):
+    os.makedirs(os.path.dirname(listing.path), exist_ok=True)
+    return write_if_changed(listing.path, listing.chunks())[1]
+
+
+def generate_listings(pages, public_dir, template, template_hash, previous, site_url=None, site_title="Feed"):
+    entries = [Entry(page_url(page.dest, public_dir), page.title or page_url(page.dest, public_dir), page.date, page.tags)
+               for page in pages]
+    listings = list(tag_listings(entries, public_dir, template, template_hash))
+    if site_url:
+        site_url = site_url.rstrip("/")
+        listings.extend(sitemap_listings(entries, public_dir, site_url))
+        listings.append(feed_listing(entries, public_dir, site_url, site_title))
+
+    sources = {os.path.normpath(page.dest): page.source for page in pages}
+    result = ListingResult()
+    for listing in listings:
+        source = sources.get(os.path.normpath(listing.path))
+        if source is not None:
+            print(f"{listing.path}: skipping listing, the output of {source} is already written there")
+            result.skipped += 1
+            continue
+        fingerprint = listing.fingerprint()
+        result.outputs[listing.path] = fingerprint
+        if previous.get(listing.path) == fingerprint and os.path.exists(listing.path):
+            result.unchanged += 1
+            continue
+        if write_listing(listing):
+            result.written += 1
+        else:
+            result.unchanged += 1
+    for path in previous:
+        if path not in result.outputs and os.path.normpath(path) not in sources:
+            remove_output(path, public_dir)
+            result.removed += 1
+    return result
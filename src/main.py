@@ -1,16 +1,24 @@
-import os, shutil
+import os, argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
 
-from blocks import markdown_to_html_node
-
-def copy_dir(source, target):
-    if os.path.exists(target):
-        shutil.rmtree(target)
-    os.mkdir(target)
-    for path in os.listdir(source):
-        if os.path.isdir(os.path.join(source, path)):
-            copy_dir(os.path.join(source, path), os.path.join(target, path))
-        if os.path.isfile(os.path.join(source, path)):
-            shutil.copy(os.path.join(source, path), os.path.join(target, path))
+from blocks import BlockStream
+from manifest import BuildManifest, GENERATOR_VERSION, CACHE_DIR, hash_file
+from assets import sync_dir
+from compress import compress_outputs
+from depgraph import TEMPLATE, Versions, changed_dependencies, describe, node, page_dependencies
+from frontmatter import scan_page
+from inline_cache import INLINE_CACHE
+from inventory import Inventory, scan_tree
+from links import check_links, write_index
+from listings import generate_listings, page_url
+from search import SearchIndex, finish_terms
+import block_cache
+from output import remove_output, prune_outputs, write_if_changed
+from pipeline import make_dirs, run_pipeline
+from template import load_template, build_date
+import profiler
 
 
 def extract_title(markdown):
@@ -20,40 +28,423 @@ def extract_title(markdown):
     return first_line[2:]
 
 
+class PageBuildError(Exception):
+    def __init__(self, path, message) -> None:
+        super().__init__(path, message)
+        self.path = path
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
 def generate_page(from_path, template_path, dest_path): 
-    assert os.path.exists(from_path), f"No file found at {from_path}"
-    markdown = open(from_path, 'r').read()
+    return write_page(from_path, load_template(template_path), dest_path)
+
 
-    assert os.path.exists(template_path), f"No template file found at {template_path}"
-    template = open(template_path, 'r').read()
+def escape_meta(value):
+    if isinstance(value, str):
+        return escape(value)
+    if isinstance(value, list):
+        return [escape_meta(item) for item in value]
+    return value
 
-    root_node = markdown_to_html_node(markdown)
-    html = root_node.to_html()
-    title = extract_title(markdown)
 
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html)
+def page_context(page, terms=None, text=None):
+    title = escape(page.title) if page.meta.get("title") else extract_title(page.heading)
+    content = BlockStream(page.source, page.body_line, terms=terms, text=text, links=[])
+    meta = {key: escape_meta(value) for key, value in page.meta.items()}
+    return {**meta, "Title": title, "Content": content, "Date": build_date()}
+
+
+def write_page(from_path, template, dest_path, page=None, terms=None, previous_output=None):
+    assert os.path.exists(from_path), f"No file found at {from_path}"
+    if page is None:
+        with profiler.stage("read"):
+            page = scan_page(from_path, dest_path)
+    context = page_context(page, terms)
 
     dest_dir = os.path.dirname(dest_path)
     if not os.path.isdir(dest_dir):
-        os.makedirs(dest_dir)
+        os.makedirs(dest_dir, exist_ok=True)
+
+    output, written = write_if_changed(dest_path, template.render_chunks(context), previous_output)
+    if terms is not None:
+        finish_terms(terms)
+    return context["Content"].links, output, written
+
+
+def find_pages(dir_path_content, dest_dir_path, inventory=None):
+    if inventory is None:
+        inventory = scan_tree(dir_path_content)
+    for entry in inventory:
+        if entry.path.endswith(".md"):
+            yield entry.path, dest_for_source(entry.rel, dest_dir_path)
+
+
+def dest_for_source(relative_path, dest_dir_path):
+    return os.path.normpath(os.path.splitext(os.path.join(dest_dir_path, relative_path))[0]+".html")
+
+
+def scan_pages(found_pages):
+    pages = []
+    for from_path, dest_path in found_pages:
+        try:
+            pages.append(scan_page(from_path, dest_path))
+        except (OSError, ValueError) as e:
+            raise PageBuildError(from_path, f"{type(e).__name__}: {e}") from e
+    return pages
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, jobs=1):
+    render_pages(scan_pages(find_pages(dir_path_content, dest_dir_path)), template_path, jobs)
+
+
+def page_template(page, template_path):
+    name = page.meta.get("template")
+    if not name:
+        return template_path
+    return os.path.normpath(os.path.join(os.path.dirname(template_path), str(name)))
+
+
+_worker_template_path = None
+_worker_is_child = False
+_worker_collect_terms = False
+
+
+def _init_worker(template_path, caches=None, child=False):
+    global _worker_template_path, _worker_is_child, _worker_collect_terms
+    _worker_template_path = template_path
+    load_template(template_path)
+    _worker_is_child = child
+    caches = caches or {}
+    _worker_collect_terms = bool(caches.get("search"))
+    if caches.get("inline") and not INLINE_CACHE.entries:
+        INLINE_CACHE.load(caches["inline"])
+    if child:
+        INLINE_CACHE.track(entries=bool(caches.get("inline")))
+    if caches.get("block") and child:
+        block_cache._active = None
+        block_cache.open_cache(caches["block"])
 
-    with open(dest_path, 'w') as outf:
-        outf.write(template)
 
+def _render_job(page, previous_output=None):
+    try:
+        with profiler.page(page.source):
+            template = load_template(page_template(page, _worker_template_path))
+            terms = Counter() if _worker_collect_terms else None
+            links, output, written = write_page(page.source, template, page.dest, page, terms, previous_output)
+    except Exception as e:
+        raise PageBuildError(page.source, f"{type(e).__name__}: {e}") from e
+    if _worker_is_child and block_cache.active() is not None:
+        block_cache.active().flush()
+    return page.source, (links, terms, output, written)
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path):
-    for path in os.listdir(dir_path_content):
-        next_path = os.path.join(dir_path_content, path)
-        if os.path.isdir(next_path):
-            generate_pages_recursive(next_path, template_path, os.path.join(dest_dir_path, path))
-        if os.path.isfile(next_path) and next_path.endswith(".md"):
-            generate_page(next_path, template_path, os.path.splitext(os.path.join(dest_dir_path, path))[0]+".html")
+
+def _render_child_job(page, previous_output=None):
+    source, result = _render_job(page, previous_output)
+    return source, result, INLINE_CACHE.drain()
+
+
+def render_pages(pages, template_path, jobs=1, caches=None, io_threads=0, outputs=None):
+    outputs = outputs or {}
+    if io_threads and jobs == 1 and len(pages) > 1:
+        _init_worker(template_path, caches)
+        make_dirs([page.dest for page in pages])
+
+        def write(page, html):
+            return _write_job(page, html, outputs.get(page.source))
+
+        results = run_pipeline(pages, _read_job, _render_text_job, write, io_threads, io_threads, io_threads * 4)
+        return {source: (links, terms, output, written) for (source, (links, terms)), (output, written) in results}
+    if jobs == 1 or len(pages) <= 1:
+        _init_worker(template_path, caches)
+        return dict(_render_job(page, outputs.get(page.source)) for page in pages)
+    chunksize = max(1, len(pages) // (jobs * 8))
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                               initargs=(template_path, caches, True))
+    links = {}
+    try:
+        for source, result, (added, counts) in pool.map(_render_child_job, pages,
+                                                        [outputs.get(page.source) for page in pages],
+                                                        chunksize=chunksize):
+            links[source] = result
+            INLINE_CACHE.merge(added, counts)
+    except BaseException:
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return links
+
+
+def _read_job(page):
+    try:
+        with open(page.source, 'r') as f:
+            return f.read()
+    except OSError as e:
+        raise PageBuildError(page.source, f"{type(e).__name__}: {e}") from e
+
+
+def _render_text_job(page, text):
+    try:
+        with profiler.page(page.source):
+            template = load_template(page_template(page, _worker_template_path))
+            terms = Counter() if _worker_collect_terms else None
+            context = page_context(page, terms, text)
+            with profiler.stage("render"):
+                html = template.render(context)
+            if terms is not None:
+                finish_terms(terms)
+            links = context["Content"].links
+    except Exception as e:
+        raise PageBuildError(page.source, f"{type(e).__name__}: {e}") from e
+    return html, (page.source, (links, terms))
+
+
+def _write_job(page, html, previous_output=None):
+    try:
+        return write_if_changed(page.dest, [html], previous_output)
+    except Exception as e:
+        raise PageBuildError(page.source, f"{type(e).__name__}: {e}") from e
+
+
+def stale_reasons(page, previous, source_hash, template_path, nodes, versions):
+    if previous is None:
+        return ["new page"]
+    reasons = []
+    if previous["hash"] != source_hash:
+        reasons.append("source changed")
+    if previous["dest"] != page.dest:
+        reasons.append("output path changed")
+    elif not os.path.exists(page.dest):
+        reasons.append("output missing")
+    if "deps" not in previous:
+        reasons.append("no dependency record")
+        return reasons
+    template_node = node(TEMPLATE, page_template(page, template_path))
+    if template_node not in previous["deps"]:
+        reasons.append(f"now uses {describe(template_node)}")
+    reasons.extend(f"{describe(node_id)} changed" for node_id in changed_dependencies(previous["deps"], nodes, versions))
+    return reasons
+
+
+def generate_pages_incremental(dir_path_content, template_path, dest_dir_path, manifest, jobs=1, found_pages=None,
+                               caches=None, static_dir=None, reasons=None, force=None, terms=None, io_threads=0,
+                               written=None, inventory=None, checksum=False):
+    if inventory is None:
+        inventory = scan_tree(dir_path_content)
+    if found_pages is None:
+        found_pages = [page for page in scan_pages(find_pages(dir_path_content, dest_dir_path, inventory))
+                       if not page.draft]
+    rebuild_all = manifest.generator_version != GENERATOR_VERSION
+    versions = Versions()
+    reasons = reasons if reasons is not None else {}
+    pages = {}
+    stale = []
+    outputs = {}
+    for page in found_pages:
+        from_path, dest_path = page.source, page.dest
+        previous = manifest.pages.get(from_path)
+        entry = inventory.get(from_path)
+        stat = [entry.size, entry.mtime_ns] if entry is not None else None
+        if stat is not None and not checksum and previous is not None and previous.get("stat") == stat:
+            source_hash = previous["hash"]
+        else:
+            source_hash = hash_file(from_path)
+        if rebuild_all:
+            why = ["generator version changed"]
+        else:
+            why = stale_reasons(page, previous, source_hash, template_path, manifest.nodes, versions)
+            if force and from_path in force:
+                why.append(force[from_path])
+        if why:
+            stale.append(page)
+            reasons[dest_path] = why
+            pages[from_path] = {"hash": source_hash, "dest": dest_path}
+            if previous is not None and previous["dest"] == dest_path and previous.get("output"):
+                outputs[from_path] = previous["output"]
+        else:
+            pages[from_path] = {"hash": source_hash, "dest": dest_path, "links": previous.get("links", []),
+                                "deps": previous["deps"]}
+            if previous.get("output"):
+                pages[from_path]["output"] = previous["output"]
+        if stat is not None:
+            pages[from_path]["stat"] = stat
+    if jobs > 1:
+        stale.sort(key=lambda page: getattr(inventory.get(page.source), "size", 0), reverse=True)
+    rendered = render_pages(stale, template_path, jobs, caches, io_threads, outputs)
+    for page in stale:
+        page_template_path = page_template(page, template_path)
+        links, page_terms, output, page_written = rendered[page.source]
+        if written is not None and page_written:
+            written.add(page.dest)
+        pages[page.source]["links"] = links
+        pages[page.source]["output"] = output
+        if terms is not None:
+            terms[page.source] = page_terms
+        pages[page.source]["deps"] = page_dependencies(page_template_path, load_template(page_template_path), links,
+                                                       page.dest, dest_dir_path, static_dir)
+
+    removed = 0
+    live_outputs = {page["dest"] for page in pages.values()}
+    for from_path, previous in manifest.pages.items():
+        if from_path not in pages and previous["dest"] not in live_outputs:
+            remove_output(previous["dest"], dest_dir_path)
+            removed += 1
+
+    manifest.generator_version = GENERATOR_VERSION
+    manifest.pages = pages
+    manifest.nodes = {node_id: versions.get(node_id) for page in pages.values() for node_id in page["deps"]}
+    return len(stale), removed
+
+
+def build(content_dir="./content/", static_dir="./static/", template_path="./template.html",
+          public_dir="./public/", cache_dir=CACHE_DIR, full=False, jobs=1, link_assets=False, checksum=False,
+          compress=False, persist_inline_cache=False, use_block_cache=False, block_cache_mb=256, clear_cache=False,
+          link_index=None, drafts=False, site_url=None, site_title="Feed", explain=False,
+          search=False, io_threads=0):
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    manifest = BuildManifest.load(manifest_path) if not full else BuildManifest(manifest_path)
+    caches = {
+        "inline": os.path.join(cache_dir, "inline_cache.json") if persist_inline_cache else None,
+        "block": os.path.join(cache_dir, "block_cache.sqlite") if use_block_cache else None,
+        "search": search,
+    }
+    if clear_cache:
+        INLINE_CACHE.clear()
+        block_cache.close_cache()
+        block_cache.clear_cache(os.path.join(cache_dir, "block_cache.sqlite"))
+        if os.path.exists(os.path.join(cache_dir, "inline_cache.json")):
+            os.remove(os.path.join(cache_dir, "inline_cache.json"))
+    if caches["inline"]:
+        INLINE_CACHE.load(caches["inline"])
+    if caches["block"]:
+        block_cache.open_cache(caches["block"], block_cache_mb * 1024 * 1024)
+
+    with profiler.stage("inventory"):
+        content = scan_tree(content_dir)
+        static = scan_tree(static_dir) if os.path.isdir(static_dir) else Inventory(static_dir)
+    with profiler.stage("scan_pages"):
+        index = scan_pages(find_pages(content_dir, public_dir, content))
+    found_pages = [page for page in index if drafts or not page.draft]
+    outputs = {page.dest for page in found_pages}
+
+    with profiler.stage("sync_assets"):
+        assets = sync_dir(static_dir, public_dir, manifest.assets, outputs, link_assets, checksum, static)
+    search_index = SearchIndex(os.path.join(cache_dir, "search.json"), public_dir) if search else None
+    force = {}
+    if search_index is not None:
+        if full:
+            search_index.reset()
+        force = {page.source: "not in search index" for page in found_pages
+                 if search_index.docs.get(page.source, {}).get("hash") != manifest.pages.get(page.source, {}).get("hash")}
+    reasons = {}
+    terms = {}
+    written = set()
+    rendered, removed = generate_pages_incremental(content_dir, template_path, public_dir, manifest, jobs=jobs,
+                                                   found_pages=found_pages, caches=caches, static_dir=static_dir,
+                                                   reasons=reasons, force=force, terms=terms, io_threads=io_threads,
+                                                   written=written, inventory=content, checksum=checksum)
+    search_outputs = set()
+    if search_index is not None:
+        with profiler.stage("search_index"):
+            changed = {page.source: (page_url(page.dest, public_dir), page.title, terms[page.source],
+                                     manifest.pages[page.source]["hash"])
+                       for page in found_pages if page.source in terms}
+            indexed = search_index.update(changed, {page.source for page in found_pages})
+            search_index.save()
+        search_outputs = search_index.outputs()
+        print(f"Search index: {indexed.written} shard(s) written, {indexed.unchanged} unchanged, {indexed.removed} removed")
+    if explain:
+        for dest_path, why in reasons.items():
+            print(f"{dest_path}: {', '.join(why)}")
+    with profiler.stage("listings"):
+        template = load_template(template_path)
+        template_version = ":".join(hash_file(path) for path in [template_path] + template.includes)
+        listings = generate_listings(found_pages, public_dir, template, template_version,
+                                     {} if full else manifest.listings, site_url, site_title)
+    manifest.listings = listings.outputs
+    if listings.outputs or listings.removed:
+        print(f"Listings: {listings.written} written, {listings.unchanged} unchanged, {listings.removed} removed")
+    if full:
+        removed += prune_outputs(public_dir, outputs | set(assets.assets) | set(listings.outputs) | search_outputs)
+    with profiler.stage("check_links"):
+        broken = check_links(manifest.pages, assets.assets + list(listings.outputs), public_dir)
+        write_index(link_index or os.path.join(cache_dir, "links.json"), manifest.pages, public_dir, broken)
+    if compress:
+        with profiler.stage("compress"):
+            compressed = compress_outputs(public_dir, jobs)
+        print(f"Compressed {compressed.compressed} file(s), {compressed.skipped} up to date")
+    manifest.assets = assets.assets
+    manifest.save()
+    if caches["inline"]:
+        INLINE_CACHE.save(caches["inline"])
+    if caches["block"]:
+        block_cache.active().flush()
+        block_cache.active().evict()
+    return rendered, len(written), removed, assets, broken
 
 
 def main():
-    copy_dir("./static/", "./public")
-    generate_pages_recursive("./content/", "./template.html", "./public/")
+    parser = argparse.ArgumentParser(description="Static site generator")
+    parser.add_argument("--full", action="store_true", help="Rebuild every page and remove anything in ./public the build did not produce")
+    parser.add_argument("--link-assets", action="store_true", help="Hardlink static files into ./public instead of copying")
+    parser.add_argument("--compress", action="store_true", help="Write precompressed .gz (and .br with brotli installed) next to text outputs")
+    parser.add_argument("--persist-inline-cache", action="store_true", help="Keep rendered inline fragments in the build cache between runs")
+    parser.add_argument("--block-cache", action="store_true", help="Reuse rendered blocks from an on-disk cache keyed by block hash")
+    parser.add_argument("--block-cache-mb", type=int, default=256, help="Size limit of the block cache before least recently used blocks are evicted")
+    parser.add_argument("--clear-cache", action="store_true", help="Delete the block and inline caches before building")
+    parser.add_argument("--checksum", action="store_true", help="Compare static files by content when their mtimes differ and always rehash page sources")
+    parser.add_argument("--drafts", action="store_true", help="Render pages marked draft: true in their front matter")
+    parser.add_argument("--site-url", help="Absolute site URL; enables sitemap.xml and feed.xml")
+    parser.add_argument("--site-title", default="Feed", help="Title of the RSS feed")
+    parser.add_argument("--search", action="store_true", help="Write a sharded full-text search index to ./public/search")
+    parser.add_argument("--explain", action="store_true", help="Print why each rebuilt page was considered out of date")
+    parser.add_argument("--link-index", metavar="PATH", help="Where to write the JSON index of every link and image target (default: .ssg-cache/links.json)")
+    parser.add_argument("--strict-links", action="store_true", help="Exit with an error when internal links or images are broken")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Render pages on N worker processes (0 = one per CPU)")
+    parser.add_argument("--io-threads", type=int, default=0, metavar="N",
+                        help="Overlap reads and writes with rendering using N reader and N writer threads (serial builds only)")
+    parser.add_argument("--profile", nargs="?", const=os.path.join(CACHE_DIR, "profile.json"), metavar="TRACE",
+                        help="Record per-stage and per-page timings and net live-block deltas and write them to TRACE "
+                             "(renders serially, without I/O threads)")
+    args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+    io_threads = args.io_threads
+    if args.profile:
+        profiler.enable()
+        jobs = 1
+        io_threads = 0
+
+    rendered, written, removed, assets, broken = build(full=args.full, jobs=jobs, link_assets=args.link_assets,
+                                                       checksum=args.checksum, compress=args.compress,
+                                                       persist_inline_cache=args.persist_inline_cache,
+                                                       use_block_cache=args.block_cache,
+                                                       block_cache_mb=args.block_cache_mb,
+                                                       clear_cache=args.clear_cache, link_index=args.link_index,
+                                                       drafts=args.drafts, site_url=args.site_url,
+                                                       site_title=args.site_title, explain=args.explain,
+                                                       search=args.search, io_threads=io_threads)
+    print(f"Rendered {rendered} page(s) ({written} written, {rendered - written} unchanged), "
+          f"removed {removed} stale output(s)")
+    print(f"Assets: {assets.copied} copied, {assets.linked} linked, {assets.unchanged} unchanged, {assets.removed} removed")
+    stats = INLINE_CACHE.stats()
+    print(f"Inline cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%})")
+    cache = block_cache.close_cache()
+    if cache is not None and jobs == 1:
+        stats = cache.stats()
+        print(f"Block cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%})")
+
+    if args.profile:
+        report = profiler.disable().write(args.profile)
+        profiler.print_report(report)
+        print(f"Wrote profile trace to {args.profile}")
+    if broken:
+        for link in broken:
+            print(link)
+        print(f"{len(broken)} broken link(s)")
+        if args.strict_links:
+            raise SystemExit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,43 @@
+import json, os
+
+from output import atomic_write, hash_file
+
+GENERATOR_VERSION = "4"
+CACHE_DIR = "./.ssg-cache"
+
+
+class BuildManifest:
+    def __init__(self, path, generator_version=None, pages=None, assets=None, listings=None, nodes=None) -> None:
+        self.path = path
+        self.generator_version = generator_version
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else []
+        self.listings = listings if listings is not None else {}
+        self.nodes = nodes if nodes is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls(path)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        return cls(path, data.get("generator_version"), data.get("pages", {}), data.get("assets", []),
+                   data.get("listings", {}), data.get("nodes", {}))
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            "generator_version": self.generator_version,
+            "pages": self.pages,
+            "assets": self.assets,
+            "listings": self.listings,
+            "nodes": self.nodes,
+        }
+        with atomic_write(self.path) as f:
+            f.write(json.dumps(data, separators=(",", ":"), sort_keys=True))
+
+    def __repr__(self) -> str:
+        return f"BuildManifest(path={self.path}, generator_version={self.generator_version}, pages={len(self.pages)})"
@@ -0,0 +1,116 @@
+import hashlib, os
+from contextlib import contextmanager
+
+import profiler
+
+SIDECAR_SUFFIXES = (".gz", ".br")
+SPOOL_BYTES = 1 << 20
+
+
+def sidecar_source(path):
+    for suffix in SIDECAR_SUFFIXES:
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return None
+
+
+def hash_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def temp_path(path):
+    return os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.ssg-tmp")
+
+
+@contextmanager
+def replacing(path):
+    tmp_path = temp_path(path)
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def atomic_write(path, mode='w'):
+    with replacing(path) as tmp_path:
+        with open(tmp_path, mode) as f:
+            yield f
+
+
+def write_if_changed(dest_path, chunks, previous_hash=None):
+    h = hashlib.sha256()
+    buffered = []
+    size = 0
+    tmp_path = temp_path(dest_path)
+    f = None
+    try:
+        for chunk in chunks:
+            data = chunk.encode()
+            h.update(data)
+            if f is not None:
+                with profiler.stage("write"):
+                    f.write(data)
+                continue
+            buffered.append(data)
+            size += len(data)
+            if size > SPOOL_BYTES:
+                with profiler.stage("write"):
+                    f = open(tmp_path, 'wb')
+                    f.writelines(buffered)
+                buffered = []
+        output_hash = h.hexdigest()
+        with profiler.stage("write"):
+            if previous_hash is None and os.path.exists(dest_path):
+                previous_hash = hash_file(dest_path)
+            if output_hash == previous_hash and os.path.exists(dest_path):
+                if f is not None:
+                    f.close()
+                    os.remove(tmp_path)
+                return output_hash, False
+            if f is None:
+                f = open(tmp_path, 'wb')
+                f.writelines(buffered)
+            f.close()
+            os.replace(tmp_path, dest_path)
+    except BaseException:
+        if f is not None:
+            f.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return output_hash, True
+
+
+def remove_output(dest_path, dest_root):
+    for path in [dest_path] + [dest_path + suffix for suffix in SIDECAR_SUFFIXES]:
+        if os.path.exists(path):
+            os.remove(path)
+    dest_dir = os.path.dirname(dest_path)
+    root = os.path.normpath(dest_root)
+    while dest_dir and os.path.normpath(dest_dir) != root and os.path.isdir(dest_dir) and not os.listdir(dest_dir):
+        os.rmdir(dest_dir)
+        dest_dir = os.path.dirname(dest_dir)
+
+
+def prune_outputs(dest_root, keep):
+    removed = 0
+    for dirpath, _, filenames in os.walk(dest_root, topdown=False):
+        for filename in filenames:
+            path = os.path.normpath(os.path.join(dirpath, filename))
+            if path in keep or sidecar_source(path) in keep or not os.path.exists(path):
+                continue
+            remove_output(path, dest_root)
+            removed += 1
+        if os.path.normpath(dirpath) != os.path.normpath(dest_root) and os.path.isdir(dirpath) and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    return removed
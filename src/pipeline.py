@@ -0,0 +1,51 @@
+import os, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def make_dirs(paths):
+    made = set()
+    for directory in sorted({os.path.dirname(path) for path in paths}):
+        if directory and directory not in made:
+            os.makedirs(directory, exist_ok=True)
+            made.add(directory)
+    return made
+
+
+def run_pipeline(items, read, render, write, readers=2, writers=2, depth=8):
+    results = []
+    writes = deque()
+    slots = threading.BoundedSemaphore(depth)
+    items = iter(items)
+    with ThreadPoolExecutor(readers, thread_name_prefix="ssg-read") as read_pool, \
+            ThreadPoolExecutor(writers, thread_name_prefix="ssg-write") as write_pool:
+        reads = deque()
+
+        def schedule():
+            for item in items:
+                reads.append((item, read_pool.submit(read, item)))
+                return
+
+        for _ in range(depth):
+            schedule()
+        try:
+            while reads:
+                item, future = reads.popleft()
+                data = future.result()
+                schedule()
+                output, result = render(item, data)
+                del data
+                slots.acquire()
+                written = write_pool.submit(write, item, output)
+                written.add_done_callback(lambda _: slots.release())
+                writes.append(written)
+                results.append((result, written))
+                while writes and writes[0].done():
+                    writes.popleft().result()
+            for written in writes:
+                written.result()
+        except BaseException:
+            for _, future in reads:
+                future.cancel()
+            raise
+    return [(result, written.result()) for result, written in results]
@@ -0,0 +1,99 @@
+import json, os, sys, time
+from contextlib import nullcontext
+
+_NULL = nullcontext()
+_active = None
+
+
+class Timer:
+    __slots__ = ("record", "start", "blocks")
+
+    def __init__(self, record) -> None:
+        self.record = record
+
+    def __enter__(self):
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record[0] += 1
+        self.record[1] += time.perf_counter() - self.start
+        self.record[2] += sys.getallocatedblocks() - self.blocks
+        return False
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.stages = {}
+        self.pages = {}
+
+    def stage(self, name):
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = [0, 0.0, 0]
+        return Timer(record)
+
+    def page(self, path):
+        record = self.pages.get(path)
+        if record is None:
+            record = self.pages[path] = [0, 0.0, 0]
+        return Timer(record)
+
+    def report(self, slowest=20):
+        stages = sorted(self.stages.items(), key=lambda item: item[1][1], reverse=True)
+        pages = sorted(self.pages.items(), key=lambda item: item[1][1], reverse=True)[:slowest]
+        return {
+            "pages_rendered": len(self.pages),
+            "stages": [
+                {"stage": name, "calls": calls, "seconds": seconds, "net_live_blocks": blocks}
+                for name, (calls, seconds, blocks) in stages
+            ],
+            "slowest_pages": [
+                {"page": path, "seconds": seconds, "net_live_blocks": blocks}
+                for path, (_, seconds, blocks) in pages
+            ],
+        }
+
+    def write(self, path, slowest=20):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        report = self.report(slowest)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+
+def enable():
+    global _active
+    _active = Profiler()
+    return _active
+
+
+def disable():
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+
+def stage(name):
+    if _active is None:
+        return _NULL
+    return _active.stage(name)
+
+
+def page(path):
+    if _active is None:
+        return _NULL
+    return _active.page(path)
+
+
+def print_report(report):
+    print(f"Profiled {report['pages_rendered']} page(s); stage times are inclusive of nested stages, "
+          f"blocks are the net change in live allocated blocks and can be negative")
+    for entry in report["stages"]:
+        print(f"  {entry['stage']:<22}{entry['calls']:>9} calls{entry['seconds'] * 1000:12.1f} ms"
+              f"{entry['net_live_blocks']:>12} net live blocks")
+    if report["slowest_pages"]:
+        print("Slowest pages:")
+        for entry in report["slowest_pages"][:5]:
+            print(f"  {entry['seconds'] * 1000:10.1f} ms  {entry['page']}")
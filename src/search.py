@@ -0,0 +1,170 @@
+import json, os, re, string
+
+from manifest import GENERATOR_VERSION
+from output import atomic_write
+
+TOKEN = re.compile(r"[^\W_]{2,40}")
+LINK_TARGET = re.compile(r"\]\([^()]*\)")
+PUNCTUATION = str.maketrans({char: " " for char in string.punctuation})
+INDEX_DIR = "search"
+SHARD = re.compile(r"[0-9a-z]{1,2}|x[0-9a-f]+")
+
+
+def tokenize(text, terms):
+    if "](" in text:
+        text = LINK_TARGET.sub("]", text)
+    terms.update(text.lower().translate(PUNCTUATION).split())
+
+
+def finish_terms(terms):
+    for word in [word for word in terms if not 2 <= len(word) <= 40 or not word.isalnum()]:
+        count = terms.pop(word)
+        for token in TOKEN.findall(word):
+            terms[token] += count
+    return terms
+
+
+def shard_name(term):
+    prefix = term[:2]
+    if prefix.isascii() and prefix.isalnum():
+        return prefix
+    return "x" + prefix.encode().hex()
+
+
+def dump(data):
+    return json.dumps(data, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+
+
+class SearchResult:
+    def __init__(self) -> None:
+        self.written = 0
+        self.unchanged = 0
+        self.removed = 0
+
+    def __repr__(self) -> str:
+        return f"SearchResult(written={self.written}, unchanged={self.unchanged}, removed={self.removed})"
+
+
+class SearchIndex:
+    def __init__(self, state_path, public_dir) -> None:
+        self.state_path = state_path
+        self.index_dir = os.path.normpath(os.path.join(public_dir, INDEX_DIR))
+        self.docs = {}
+        self.shards = set()
+        self.next_id = 0
+        try:
+            with open(state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if state.get("version") == GENERATOR_VERSION and os.path.isdir(self.index_dir):
+            self.docs = state["docs"]
+            self.shards = set(state["shards"])
+            self.next_id = state["next_id"]
+
+    def reset(self):
+        self.docs = {}
+        self.next_id = 0
+
+    def clear(self):
+        names = set(self.shards)
+        docs_path = os.path.join(self.index_dir, "docs.json")
+        try:
+            with open(docs_path, 'r') as f:
+                names.update(name for name in json.load(f)["shards"] if SHARD.fullmatch(name))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        for path in [self.shard_path(name) for name in names] + [docs_path]:
+            if os.path.isfile(path):
+                os.remove(path)
+        self.shards = set()
+
+    def outputs(self):
+        return {self.shard_path(name) for name in self.shards} | {os.path.join(self.index_dir, "docs.json")}
+
+    def shard_path(self, name):
+        return os.path.join(self.index_dir, f"{name}.json")
+
+    def update(self, changed, live_sources):
+        if not self.docs:
+            self.clear()
+        affected = set()
+        stale_ids = set()
+        postings = {}
+        for source in [source for source in self.docs if source not in live_sources]:
+            doc = self.docs.pop(source)
+            affected.update(doc["shards"])
+            stale_ids.add(doc["id"])
+        for source, (url, title, terms, source_hash) in changed.items():
+            doc = self.docs.get(source)
+            if doc is not None:
+                affected.update(doc["shards"])
+                stale_ids.add(doc["id"])
+                doc_id = doc["id"]
+            else:
+                doc_id = self.next_id
+                self.next_id += 1
+            shards = set()
+            for term, count in terms.items():
+                name = shard_name(term)
+                shards.add(name)
+                postings.setdefault(name, {}).setdefault(term, []).extend((doc_id, count))
+            affected.update(shards)
+            self.docs[source] = {"id": doc_id, "url": url, "title": title, "hash": source_hash, "shards": sorted(shards)}
+
+        result = SearchResult()
+        os.makedirs(self.index_dir, exist_ok=True)
+        for name in sorted(affected):
+            path = self.shard_path(name)
+            try:
+                with open(path, 'r') as f:
+                    previous = f.read()
+                data = json.loads(previous)
+            except (OSError, ValueError):
+                previous, data = None, {}
+            for term, plist in list(data.items()):
+                kept = [value for pair in zip(plist[::2], plist[1::2]) if pair[0] not in stale_ids for value in pair]
+                if kept:
+                    data[term] = kept
+                else:
+                    del data[term]
+            for term, plist in postings.get(name, {}).items():
+                data.setdefault(term, []).extend(plist)
+            if not data:
+                self.shards.discard(name)
+                if previous is not None:
+                    os.remove(path)
+                    result.removed += 1
+                continue
+            self.shards.add(name)
+            if self.write(path, dump(data), previous):
+                result.written += 1
+            else:
+                result.unchanged += 1
+
+        docs = {doc["id"]: [doc["url"], doc["title"]] for doc in self.docs.values()}
+        self.write(os.path.join(self.index_dir, "docs.json"), dump({"docs": docs, "shards": sorted(self.shards)}))
+        return result
+
+    @staticmethod
+    def write(path, text, previous=None):
+        if previous is None:
+            try:
+                with open(path, 'r') as f:
+                    previous = f.read()
+            except OSError:
+                pass
+        if previous == text:
+            return False
+        with atomic_write(path) as f:
+            f.write(text)
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        with atomic_write(self.state_path) as f:
+            json.dump({"version": GENERATOR_VERSION, "docs": self.docs, "shards": sorted(self.shards),
+                       "next_id": self.next_id}, f)
+
+    def __repr__(self) -> str:
+        return f"SearchIndex(docs={len(self.docs)}, shards={len(self.shards)})"
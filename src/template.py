@@ -0,0 +1,93 @@
+import datetime, os, re
+
+PLACEHOLDER = re.compile(r"\{\{\s*([\w.-]+)\s*\}\}")
+INCLUDE = re.compile(r"\{\{>\s*([\w./-]+)\s*\}\}")
+
+
+class Template:
+    def __init__(self, source, includes=()) -> None:
+        self.includes = list(includes)
+        self.statics = []
+        self.slots = []
+        start = 0
+        for match in PLACEHOLDER.finditer(source):
+            self.statics.append(source[start:match.start()])
+            self.slots.append(match.group(1))
+            start = match.end()
+        self.statics.append(source[start:])
+
+    def render_chunks(self, context):
+        for static, slot in zip(self.statics, self.slots):
+            if static:
+                yield static
+            value = context.get(slot)
+            if value is None:
+                continue
+            if isinstance(value, str):
+                yield value
+            elif hasattr(value, "to_html_chunks"):
+                yield from value.to_html_chunks()
+            elif isinstance(value, (list, tuple)):
+                yield ", ".join([str(item) for item in value])
+            else:
+                yield str(value)
+        if self.statics[-1]:
+            yield self.statics[-1]
+
+    def render(self, context):
+        return "".join(self.render_chunks(context))
+
+    def write(self, fp, context):
+        fp.writelines(self.render_chunks(context))
+
+    def __repr__(self) -> str:
+        return f"Template(slots={self.slots})"
+
+
+_template_cache = {}
+
+
+def expand_includes(template_path, includes, stack=()):
+    with open(template_path, 'r') as f:
+        source = f.read()
+    base_dir = os.path.dirname(template_path)
+
+    def include(match):
+        path = os.path.normpath(os.path.join(base_dir, match.group(1)))
+        if path in stack or path == template_path:
+            raise ValueError(f"Include cycle in {template_path}: {match.group(1)}")
+        if not os.path.isfile(path):
+            raise ValueError(f"{template_path}: included file {match.group(1)} not found")
+        if path not in includes:
+            includes.append(path)
+        return expand_includes(path, includes, stack + (template_path,))
+
+    return INCLUDE.sub(include, source)
+
+
+def file_key(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_template(template_path):
+    assert os.path.exists(template_path), f"No template file found at {template_path}"
+    cached = _template_cache.get(template_path)
+    if cached is not None:
+        try:
+            if all(file_key(path) == key for path, key in cached[0]):
+                return cached[1]
+        except FileNotFoundError:
+            pass
+    includes = []
+    source = expand_includes(template_path, includes)
+    template = Template(source, includes)
+    _template_cache[template_path] = ([(path, file_key(path)) for path in [template_path] + includes], template)
+    return template
+
+
+def build_date():
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        return datetime.datetime.fromtimestamp(int(epoch), datetime.timezone.utc).date().isoformat()
+    return datetime.date.today().isoformat()
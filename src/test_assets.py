@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from assets import sync_dir
+
+
+class TestSyncDir(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def test_sync(self):
+        result = sync_dir(self.static, self.public)
+        self.assertEqual((2, 0, 0), (result.copied, result.unchanged, result.removed))
+        with open(os.path.join(self.public, "images", "a.png")) as f:
+            self.assertEqual("png", f.read())
+
+        result = sync_dir(self.static, self.public, result.assets)
+        self.assertEqual((0, 2, 0), (result.copied, result.unchanged, result.removed))
+
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        result = sync_dir(self.static, self.public, result.assets)
+        self.assertEqual((1, 0, 1), (result.copied, result.unchanged, result.removed))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+        with open(os.path.join(self.public, "index.css")) as f:
+            self.assertEqual("body { color: red }", f.read())
+
+    def test_exclude_and_checksum(self):
+        excluded = os.path.normpath(os.path.join(self.public, "index.css"))
+        result = sync_dir(self.static, self.public, exclude={excluded})
+        self.assertEqual(1, result.copied)
+        self.assertFalse(os.path.exists(excluded))
+
+        os.utime(os.path.join(self.static, "images", "a.png"), ns=(0, 0))
+        result = sync_dir(self.static, self.public, result.assets, exclude={excluded}, checksum=True)
+        self.assertEqual((0, 1), (result.copied, result.unchanged))
+
+    def test_hardlinks(self):
+        result = sync_dir(self.static, self.public, link=True)
+        self.assertEqual(2, result.linked + result.copied)
+        source = os.stat(os.path.join(self.static, "index.css"))
+        target = os.stat(os.path.join(self.public, "index.css"))
+        if result.linked:
+            self.assertEqual(source.st_ino, target.st_ino)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import os, shutil, tempfile, unittest
+
+import block_cache
+from block_cache import BlockCache
+from blocks import markdown_to_html_node
+
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "blocks.sqlite")
+
+    def tearDown(self):
+        block_cache.close_cache()
+        shutil.rmtree(self.root)
+
+    def test_cached_render_is_identical(self):
+        markdown = "# Title\n\nSome **bold** text\n\n```\ncode\n```\n\n* a\n* b\n\n> quote"
+        expected = markdown_to_html_node(markdown).to_html()
+        cache = block_cache.open_cache(self.path)
+        self.assertEqual(expected, markdown_to_html_node(markdown).to_html())
+        self.assertEqual((0, 5), (cache.hits, cache.misses))
+        block_cache.close_cache()
+
+        cache = block_cache.open_cache(self.path)
+        self.assertEqual(expected, markdown_to_html_node(markdown).to_html())
+        self.assertEqual((5, 0), (cache.hits, cache.misses))
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(self.path, max_bytes=100)
+        cache.put("old", "x" * 60)
+        cache.flush()
+        cache.conn.execute("UPDATE blocks SET used = 0")
+        cache.put("new", "y" * 60)
+        cache.flush()
+        self.assertEqual(1, cache.evict())
+        self.assertEqual({"new": "y" * 60}, cache.get_many(["old", "new"]))
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
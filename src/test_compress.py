@@ -0,0 +1,41 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import compress_outputs, negotiate, parse_accept_encoding
+
+
+class TestCompress(unittest.TestCase):
+    def test_compress_outputs(self):
+        with tempfile.TemporaryDirectory() as root:
+            page = os.path.join(root, "index.html")
+            with open(page, 'w') as f:
+                f.write("<p>hello</p>" * 100)
+            with open(os.path.join(root, "tiny.css"), 'w') as f:
+                f.write("a {}")
+            with open(os.path.join(root, "orphan.html.gz"), 'wb') as f:
+                f.write(b"stale")
+
+            result = compress_outputs(root, jobs=2)
+            self.assertEqual((1, 1, 1), (result.compressed, result.skipped, result.removed))
+            with gzip.open(page + ".gz", 'rt') as f:
+                self.assertEqual("<p>hello</p>" * 100, f.read())
+            self.assertFalse(os.path.exists(os.path.join(root, "tiny.css.gz")))
+
+            result = compress_outputs(root)
+            self.assertEqual((0, 2), (result.compressed, result.skipped))
+
+            self.assertEqual((page + ".gz", "gzip"), negotiate(page, "gzip, deflate, br"))
+            self.assertEqual((page, None), negotiate(page, "gzip;q=0, identity"))
+            with open(page, 'a') as f:
+                f.write("changed")
+            os.utime(page, ns=(1, 1))
+            self.assertEqual((page, None), negotiate(page, "gzip"))
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual({"gzip": 1.0, "br": 0.5, "*": 0.0}, parse_accept_encoding("gzip, br;q=0.5, *;q=0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import os
+import random
+import tempfile
+import unittest
+
+from blocks import markdown_to_html_node
+from corpus import CorpusOptions, generate_markdown, write_corpus
+
+
+class TestCorpus(unittest.TestCase):
+    def test_seeded_and_renderable(self):
+        options = CorpusOptions(seed=7, inline_density=0.5, blocks_per_page=30)
+        first = generate_markdown(random.Random(7), "Page", options)
+        self.assertEqual(first, generate_markdown(random.Random(7), "Page", options))
+        self.assertTrue(first.startswith("# Page\n\n"))
+        markdown_to_html_node(first).to_html()
+
+    def test_write_corpus_nesting(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = write_corpus(root, 12, CorpusOptions(depth=2, fanout=3))
+            self.assertEqual(12, len(paths))
+            for path in paths:
+                self.assertEqual(2, os.path.relpath(path, root).count(os.sep))
+
+
+if __name__ == "__main__":
+    unittest.main()
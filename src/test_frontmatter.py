@@ -0,0 +1,33 @@
+import datetime, io, unittest
+
+from frontmatter import PageInfo, read_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_parses_header_only(self):
+        f = io.StringIO("---\ntitle: 'Hello: world'\ndate: 2024-03-01\ntags:\n  - one\n  - two\ndraft: yes\n---\n\n# Heading\n\nbody\n")
+        meta, heading, body_line = read_front_matter(f)
+        self.assertEqual({"title": "Hello: world", "date": "2024-03-01", "tags": ["one", "two"], "draft": True}, meta)
+        self.assertEqual(("# Heading\n", 10), (heading, body_line))
+        self.assertEqual("\nbody\n", f.read())
+
+        page = PageInfo("a.md", "a.html", meta, heading, body_line)
+        self.assertEqual(("Hello: world", datetime.date(2024, 3, 1), ["one", "two"], True),
+                         (page.title, page.date, page.tags, page.draft))
+
+    def test_without_front_matter(self):
+        meta, heading, body_line = read_front_matter(io.StringIO("# Title\n\ntext"))
+        page = PageInfo("a.md", "a.html", meta, heading, body_line)
+        self.assertEqual(("Title", None, [], False, 1), (page.title, page.date, page.tags, page.draft, page.body_line))
+
+    def test_inline_lists_and_errors(self):
+        meta, _, _ = read_front_matter(io.StringIO("---\ntags: [a, \"b c\"]\n---\n# T"))
+        self.assertEqual(["a", "b c"], meta["tags"])
+        with self.assertRaises(ValueError):
+            read_front_matter(io.StringIO("---\ntitle: x\n# T"))
+        with self.assertRaises(ValueError):
+            read_front_matter(io.StringIO("---\nnot a pair\n---\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
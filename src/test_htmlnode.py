@@ -1,6 +1,8 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, text_node_to_html_node
+from textnode import TextNode
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -47,6 +49,38 @@ class TestHTMLNode(unittest.TestCase):
         )
         self.assertEqual('<p><b>Bold text</b>Normal text<i>italic text</i>Normal text<div class="test"><a>Link text</a></div></p>', node.to_html())
 
+        self.assertRaises(ValueError, ParentNode("p", []).to_html)
+        self.assertRaises(ValueError, ParentNode(None, [LeafNode(None, "text")]).to_html)
+
+    def test_streaming(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode("b", str(i))]) for i in range(3)], props={"class": "list"})
+        fp = io.StringIO()
+        node.write_html(fp)
+        self.assertEqual('<ul class="list"><li><b>0</b></li><li><b>1</b></li><li><b>2</b></li></ul>', fp.getvalue())
+        self.assertEqual(fp.getvalue(), "".join(node.to_html_chunks()))
+
+        node = LeafNode(None, "deep")
+        for _ in range(5000):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<div><div>"))
+        self.assertEqual(len("<div></div>") * 5000 + len("deep"), len(html))
+
+
+    def test_slotted_nodes(self):
+        link = text_node_to_html_node(TextNode("Home", "link", "/"))
+        image = text_node_to_html_node(TextNode("alt text", "image", "/a.png"))
+        self.assertEqual({"href": "/"}, link.props)
+        self.assertEqual({"src": "/a.png", "alt": "alt text"}, image.props)
+        self.assertEqual('<a href="/">Home</a>', link.to_html())
+        self.assertEqual('<img src="/a.png" alt="alt text">', image.to_html())
+        for node in [link, image, LeafNode("b", "x"), ParentNode("p", [link]), TextNode("x", "text")]:
+            self.assertFalse(hasattr(node, "__dict__"))
+
+        link.props["class"] = "c"
+        self.assertEqual('<a href="/" class="c">Home</a>', link.to_html())
+        image.props = {"src": "/b.png"}
+        self.assertEqual('<img src="/b.png">', image.to_html())
 
 
 if __name__ == "__main__":
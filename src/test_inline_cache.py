@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+from blocks import render_inline
+from inline_cache import INLINE_CACHE, InlineCache
+
+
+class TestInlineCache(unittest.TestCase):
+    def test_lru_and_stats(self):
+        cache = InlineCache(max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        self.assertEqual("A", cache.get("a"))
+        cache.put("c", "C")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual({"entries": 2, "hits": 1, "misses": 1, "hit_rate": 0.5}, cache.stats())
+
+        cache.put("x" * 2000, "too long")
+        self.assertNotIn("x" * 2000, cache.entries)
+
+    def test_persistence(self):
+        cache = InlineCache()
+        cache.put("**a**", "<b>a</b>")
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "inline_cache.json")
+            cache.save(path)
+            loaded = InlineCache()
+            self.assertTrue(loaded.load(path))
+            self.assertEqual("<b>a</b>", loaded.get("**a**"))
+
+    def test_render_inline_uses_cache(self):
+        INLINE_CACHE.clear()
+        text = "A [link](/) and *emphasis*"
+        self.assertEqual('A <a href="/">link</a> and <i>emphasis</i>', render_inline(text))
+        self.assertEqual(render_inline(text), render_inline(text))
+        self.assertEqual(2, INLINE_CACHE.stats()["hits"])
+
+
+if __name__ == "__main__":
+    unittest.main()
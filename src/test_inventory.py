@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+from inventory import scan_tree
+
+
+class TestInventory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "b", "empty"))
+        for path, text in (("c.md", "ccc"), ("a.md", "a"), (os.path.join("b", "x.png"), "png")):
+            with open(os.path.join(self.root, path), 'w') as f:
+                f.write(text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan_tree(self):
+        inventory = scan_tree(self.root)
+        self.assertEqual(["a.md", os.path.join("b", "x.png"), "c.md"], [entry.rel for entry in inventory])
+        self.assertEqual([os.path.join("b"), os.path.join("b", "empty")], inventory.dirs)
+        entry = inventory.get(os.path.join(self.root, "c.md"))
+        self.assertEqual(3, entry.size)
+        self.assertEqual(os.stat(entry.path).st_mtime_ns, entry.mtime_ns)
+        self.assertIsNone(inventory.get(os.path.join(self.root, "missing.md")))
+
+    def test_missing_root(self):
+        with self.assertRaises(FileNotFoundError):
+            scan_tree(os.path.join(self.root, "missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
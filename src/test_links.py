@@ -0,0 +1,46 @@
+import os, tempfile, unittest
+
+import block_cache
+from blocks import BlockStream
+from links import check_links
+
+
+class TestLinks(unittest.TestCase):
+    def test_links_are_recorded_while_rendering(self):
+        markdown = ("# Title\n\n![img](/a.png) and [link](b)\n\n```one line```\n\n"
+                    "`[x](/nope)` then\n[last](https://example.com) and *see [docs](/d)*")
+        expected = [["image", "/a.png", 3], ["link", "b", 3], ["link", "https://example.com", 8], ["link", "/d", 8]]
+        html = None
+        with tempfile.TemporaryDirectory() as root:
+            for cache in (None, os.path.join(root, "blocks.sqlite"), os.path.join(root, "blocks.sqlite")):
+                if cache:
+                    block_cache.open_cache(cache)
+                try:
+                    stream = BlockStream("page.md", text=markdown, links=[])
+                    rendered = "".join(stream.to_html_chunks())
+                finally:
+                    block_cache.close_cache()
+                self.assertEqual(expected, stream.links)
+                self.assertEqual(html or rendered, rendered)
+                html = rendered
+        self.assertIn("<code>[x](/nope)</code>", html)
+
+    def test_check_links(self):
+        pages = {
+            "content/index.md": {"dest": "public/index.html", "links": [
+                ["link", "/post", 3], ["link", "post/index.html#top", 4], ["link", "/missing", 5],
+                ["link", "https://example.com/missing", 6], ["image", "/images/a.png", 7],
+            ]},
+            "content/post/index.md": {"dest": "public/post/index.html", "links": [
+                ["link", "../", 2], ["image", "a.png", 3],
+            ]},
+        }
+        broken = check_links(pages, ["public/images/a.png"], "public")
+        self.assertEqual(
+            [("content/index.md", 5, "/missing"), ("content/post/index.md", 3, "a.png")],
+            [(link.source, link.line, link.url) for link in broken],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
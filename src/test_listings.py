@@ -0,0 +1,82 @@
+import os, tempfile, unittest
+
+import listings
+from frontmatter import PageInfo
+from listings import generate_listings
+from template import Template
+
+
+class TestListings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public = self.tmp.name
+        self.template = Template("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def page(self, name, date, tags):
+        return PageInfo(f"content/{name}.md", os.path.join(self.public, f"{name}.html"),
+                        {"title": name, "date": date, "tags": tags})
+
+    def generate(self, pages, previous):
+        return generate_listings(pages, self.public, self.template, "template", previous, "https://example.com")
+
+    def test_only_changed_listings_are_rewritten(self):
+        pages = [self.page("a", "2024-01-01", ["x"]), self.page("b", "2024-02-01", ["y"])]
+        first = self.generate(pages, {})
+        self.assertEqual(5, first.written)
+        with open(os.path.join(self.public, "tags", "x", "index.html")) as f:
+            self.assertIn('<a href="/a.html">a</a>', f.read())
+
+        second = self.generate(pages, first.outputs)
+        self.assertEqual((0, 5), (second.written, second.unchanged))
+
+        pages[0] = self.page("a", "2024-01-01", ["y"])
+        third = self.generate(pages, second.outputs)
+        self.assertEqual((2, 2, 1), (third.written, third.unchanged, third.removed))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "tags", "x")))
+
+    def test_listings_never_overwrite_pages(self):
+        tags_page = PageInfo("content/tags/index.md", os.path.join(self.public, "tags", "index.html"), {"title": "Tags"})
+        os.makedirs(os.path.join(self.public, "tags"))
+        with open(tags_page.dest, 'w') as f:
+            f.write("hand written")
+        pages = [self.page("a", "2024-01-01", ["x"]), tags_page]
+        first = self.generate(pages, {})
+        second = self.generate(pages, {**first.outputs, tags_page.dest: "stale"})
+        self.assertEqual((1, 1, 0), (first.skipped, second.skipped, second.removed))
+        self.assertNotIn(tags_page.dest, first.outputs)
+        with open(tags_page.dest) as f:
+            self.assertEqual("hand written", f.read())
+        self.assertTrue(os.path.exists(os.path.join(self.public, "tags", "x", "index.html")))
+
+    def test_titles_and_tags_are_escaped(self):
+        self.generate([self.page("Q&A <draft>", "2024-01-01", ["C&C"])], {})
+        with open(os.path.join(self.public, "tags", "c-c", "index.html")) as f:
+            html = f.read()
+        self.assertIn("<title>Tagged C&amp;C</title>", html)
+        self.assertIn("<h1>Tagged C&amp;C</h1>", html)
+        self.assertIn(">Q&amp;A &lt;draft&gt;</a>", html)
+
+    def test_pagination_and_sitemap_shards(self):
+        pages = [self.page(f"p{i}", f"2024-01-{i + 1:02}", ["t"]) for i in range(5)]
+        old_page_size, old_shard_size = listings.PAGE_SIZE, listings.SITEMAP_SHARD_SIZE
+        listings.PAGE_SIZE, listings.SITEMAP_SHARD_SIZE = 2, 2
+        try:
+            result = self.generate(pages, {})
+        finally:
+            listings.PAGE_SIZE, listings.SITEMAP_SHARD_SIZE = old_page_size, old_shard_size
+        names = {os.path.relpath(path, self.public) for path in result.outputs}
+        self.assertEqual({
+            "feed.xml", "sitemap.xml", "sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml", "tags/index.html",
+            "tags/t/index.html", "tags/t/page/2/index.html", "tags/t/page/3/index.html",
+        }, names)
+        with open(os.path.join(self.public, "tags", "t", "page", "2", "index.html")) as f:
+            html = f.read()
+        self.assertIn('<a href="/tags/t/" rel="prev">', html)
+        self.assertIn('<a href="/tags/t/page/3/" rel="next">', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
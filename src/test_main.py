@@ -0,0 +1,174 @@
+import os
+import tempfile
+import unittest
+
+from inline_cache import INLINE_CACHE
+from main import PageBuildError, generate_pages_incremental, generate_pages_recursive
+from manifest import BuildManifest, hash_file
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.public = os.path.join(self.root, "public")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content, "post"))
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nHello")
+        self.write(os.path.join(self.content, "post", "index.md"), "# Post\n\nA *post*")
+        self.manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def build(self):
+        result = generate_pages_incremental(self.content, self.template, self.public, self.manifest)
+        self.manifest.save()
+        self.manifest = BuildManifest.load(self.manifest.path)
+        return result
+
+    def test_only_changed_pages_rerender(self):
+        self.assertEqual((2, 0), self.build())
+        self.assertEqual((0, 0), self.build())
+
+        self.write(os.path.join(self.content, "post", "index.md"), "# Post\n\nAn **edited** post")
+        self.assertEqual((1, 0), self.build())
+        with open(os.path.join(self.public, "post", "index.html")) as f:
+            self.assertIn("<b>edited</b>", f.read())
+
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual((2, 0), self.build())
+
+    def test_dependencies_invalidate_only_their_pages(self):
+        static = os.path.join(self.root, "static")
+        os.makedirs(static)
+        self.write(os.path.join(static, "a.png"), "png")
+        self.write(os.path.join(self.root, "foot.html"), "<footer>one</footer>")
+        self.write(os.path.join(self.root, "alt.html"), "{{ Content }}{{> foot.html }}")
+        self.write(os.path.join(self.content, "alt.md"), "---\ntemplate: alt.html\n---\n# Alt\n\n![a](/a.png)")
+
+        def build():
+            reasons = {}
+            generate_pages_incremental(self.content, self.template, self.public, self.manifest, static_dir=static,
+                                       reasons=reasons)
+            self.manifest.save()
+            self.manifest = BuildManifest.load(self.manifest.path)
+            return {os.path.relpath(dest, self.public): why for dest, why in reasons.items()}
+
+        self.assertEqual(3, len(build()))
+        self.assertEqual({}, build())
+        self.write(os.path.join(self.root, "foot.html"), "<footer>two</footer>")
+        self.assertEqual({"alt.html": ["include " + os.path.join(self.root, "foot.html") + " changed"]}, build())
+        os.utime(os.path.join(static, "a.png"), ns=(0, 0))
+        self.assertEqual({"alt.html": ["asset " + os.path.join(static, "a.png") + " changed"]}, build())
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(["index.html", os.path.join("post", "index.html")], sorted(build()))
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "post", "index.md"))
+        self.assertEqual((0, 1), self.build())
+        self.assertFalse(os.path.exists(os.path.join(self.public, "post")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_drafts_are_skipped(self):
+        self.write(os.path.join(self.content, "draft.md"), "---\ndraft: true\n---\n# Draft\n\nWork in progress")
+        self.write(os.path.join(self.content, "dated.md"), "---\ntitle: Dated\ndate: 2024-01-02\n---\n\n# Heading\n\nText")
+        self.assertEqual((3, 0), self.build())
+        self.assertFalse(os.path.exists(os.path.join(self.public, "draft.html")))
+        with open(os.path.join(self.public, "dated.html")) as f:
+            self.assertEqual("<title>Dated</title><div><h1>Heading</h1><p>Text</p></div>", f.read())
+
+    def test_front_matter_is_escaped(self):
+        self.write(self.template, "<title>{{ Title }}</title><p>{{ tags }}</p>{{ Content }}")
+        self.write(os.path.join(self.content, "amp.md"), '---\ntitle: "A & B <post>"\ntags: [x<y, z]\n---\n# A & B\n\nText')
+        self.build()
+        with open(os.path.join(self.public, "amp.html")) as f:
+            self.assertEqual("<title>A &amp; B &lt;post&gt;</title><p>x&lt;y, z</p><div><h1>A & B</h1><p>Text</p></div>",
+                             f.read())
+
+    def read_outputs(self, public):
+        outputs = {}
+        for dirpath, _, filenames in os.walk(public):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, 'rb') as f:
+                    outputs[os.path.relpath(path, public)] = f.read()
+        return outputs
+
+    def test_parallel_matches_serial(self):
+        for i in range(6):
+            self.write(os.path.join(self.content, f"page{i}.md"), f"# Page {i}\n\n* item **{i}**\n* [link](/post)")
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+        generate_pages_recursive(self.content, self.template, serial)
+        generate_pages_recursive(self.content, self.template, parallel, jobs=3)
+        self.assertEqual(self.read_outputs(serial), self.read_outputs(parallel))
+
+    def test_pipeline_matches_serial(self):
+        for i in range(10):
+            self.write(os.path.join(self.content, "post", f"page{i}.md"), f"# Page {i}\n\n```\ncode {i}\n```\n\n> quote")
+        serial = os.path.join(self.root, "serial")
+        pipelined = os.path.join(self.root, "pipelined")
+        manifest = BuildManifest(os.path.join(self.root, "pipelined.json"))
+        generate_pages_recursive(self.content, self.template, serial)
+        self.assertEqual((12, 0), generate_pages_incremental(self.content, self.template, pipelined, manifest,
+                                                             io_threads=2))
+        self.assertEqual(self.read_outputs(serial), self.read_outputs(pipelined))
+
+        bad_path = os.path.join(self.content, "bad.md")
+        self.write(bad_path, "No title here")
+        with self.assertRaises(PageBuildError) as ctx:
+            generate_pages_incremental(self.content, self.template, pipelined, BuildManifest(manifest.path),
+                                       io_threads=2)
+        self.assertEqual(bad_path, ctx.exception.path)
+
+    def test_unchanged_outputs_are_not_rewritten(self):
+        self.build()
+        output = os.path.join(self.public, "post", "index.html")
+        self.assertEqual(hash_file(output), self.manifest.pages[os.path.join(self.content, "post", "index.md")]["output"])
+        os.utime(output, ns=(0, 0))
+        self.write(os.path.join(self.content, "post", "index.md"), "# Post\n\nA *post*\n")
+        for io_threads in (0, 2):
+            written = set()
+            generate_pages_incremental(self.content, self.template, self.public, BuildManifest(self.manifest.path),
+                                       io_threads=io_threads, written=written)
+            self.assertEqual(set(), written)
+            self.assertEqual(0, os.stat(output).st_mtime_ns)
+
+        self.write(os.path.join(self.content, "post", "index.md"), "# Post\n\nA *new* post")
+        written = set()
+        generate_pages_incremental(self.content, self.template, self.public, BuildManifest(self.manifest.path),
+                                   written=written)
+        self.assertEqual({output}, {os.path.normpath(path) for path in written})
+        self.assertEqual([], [name for _, _, names in os.walk(self.public) for name in names if "ssg-tmp" in name])
+
+    def test_parallel_workers_return_inline_cache_entries(self):
+        INLINE_CACHE.clear()
+        caches = {"inline": os.path.join(self.root, "inline_cache.json")}
+        for i in range(4):
+            self.write(os.path.join(self.content, f"page{i}.md"), f"# Page {i}\n\nText **{i}**")
+        generate_pages_incremental(self.content, self.template, self.public, self.manifest, jobs=2, caches=caches)
+        self.assertIn("A *post*", INLINE_CACHE.entries)
+        self.assertIn("Text **3**", INLINE_CACHE.entries)
+        self.assertEqual(len(INLINE_CACHE.entries), INLINE_CACHE.stats()["misses"])
+        INLINE_CACHE.clear()
+
+    def test_errors_carry_path(self):
+        bad_path = os.path.join(self.content, "bad.md")
+        self.write(bad_path, "No title here")
+        for jobs in (1, 2):
+            with self.assertRaises(PageBuildError) as ctx:
+                generate_pages_recursive(self.content, self.template, self.public, jobs=jobs)
+            self.assertEqual(bad_path, ctx.exception.path)
+            self.assertIn("h1 header", str(ctx.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
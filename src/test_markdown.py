@@ -1,7 +1,11 @@
+import os
+import tempfile
 import unittest
+from collections import Counter
 
-from blocks import markdown_to_blocks, block_to_block_type, markdown_to_html_node
+from blocks import markdown_to_blocks, block_to_block_type, markdown_to_html_node, iter_blocks, BlockStream
 from block_types import *
+from search import finish_terms
 
 class TestHTMLNode(unittest.TestCase):
     def test_markdown_blocks(self):
@@ -41,6 +45,48 @@ class TestHTMLNode(unittest.TestCase):
         for block, block_type in blocks:
             self.assertEqual(block_type, block_to_block_type(block))
 
+    def test_fenced_code_blocks(self):
+        markdown = "Intro\n\n```\nline one\n\n\nline two\n```\n\n* item"
+        expected = [
+            ("Intro", block_type_paragraph),
+            ("```\nline one\n\n\nline two\n```", block_type_code),
+            ("* item", block_type_unordered_list),
+        ]
+        self.assertEqual(expected, list(iter_blocks(markdown)))
+        self.assertEqual(expected, list(iter_blocks(line + "\n" for line in markdown.split("\n"))))
+
+        expected = "<div><p>Intro</p><pre><code>line one\n\n\nline two</code></pre><ul><li>item</li></ul></div>"
+        self.assertEqual(expected, markdown_to_html_node(markdown).to_html())
+
+        markdown = "```one line```\n\nafter"
+        self.assertEqual([("```one line```", block_type_code), ("after", block_type_paragraph)], list(iter_blocks(markdown)))
+
+        markdown = "Intro:\n```\ncode\n\nmore\n```\nOutro"
+        expected = [
+            ("Intro:", block_type_paragraph),
+            ("```\ncode\n\nmore\n```", block_type_code),
+            ("Outro", block_type_paragraph),
+        ]
+        self.assertEqual(expected, list(iter_blocks(markdown)))
+        self.assertEqual("<div><p>Intro:</p><pre><code>code\n\nmore</code></pre><p>Outro</p></div>",
+                         markdown_to_html_node(markdown).to_html())
+
+    def test_block_stream_matches_tree(self):
+        markdown = "# Title\n\nSome **bold** text\n\n```\ncode\n\nmore\n```\n\n1. one\n2. two\n\n> quote\n"
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "page.md")
+            with open(path, 'w') as f:
+                f.write(markdown)
+            stream = BlockStream(path, batch_size=2)
+            self.assertEqual(markdown_to_html_node(markdown).to_html(), "".join(stream.to_html_chunks()))
+            self.assertEqual("".join(stream.to_html_chunks()), "".join(stream.to_html_chunks()))
+
+    def test_block_stream_terms_come_from_rendered_text(self):
+        terms = Counter()
+        items = "\n".join(f"{number}. item" for number in range(1, 11))
+        stream = BlockStream("page.md", text=f"# Title\n\n{items}\n\n![an image](/url_path.png)\n", terms=terms)
+        "".join(stream.to_html_chunks())
+        self.assertEqual({"title": 1, "item": 10, "an": 1, "image": 1}, dict(finish_terms(terms)))
 
     def test_markdown_to_node(self):
         def assert_equals_html(unit, expected, markdown):
@@ -0,0 +1,25 @@
+import os
+import tempfile
+import unittest
+
+from output import atomic_write, temp_path
+
+
+class TestOutput(unittest.TestCase):
+    def test_atomic_write(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "state.json")
+            with atomic_write(path) as f:
+                f.write("one")
+            with self.assertRaises(RuntimeError):
+                with atomic_write(path) as f:
+                    f.write("two")
+                    raise RuntimeError("interrupted")
+            with open(path) as f:
+                self.assertEqual("one", f.read())
+            self.assertEqual(["state.json"], os.listdir(root))
+            self.assertEqual(os.path.join(root, ".state.json.ssg-tmp"), temp_path(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
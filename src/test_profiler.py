@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+import profiler
+from blocks import BlockStream, markdown_to_html_node
+from inline_cache import INLINE_CACHE
+from output import write_if_changed
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled_is_noop(self):
+        self.assertIs(profiler.stage("x"), profiler.stage("y"))
+
+    def test_records_stages_without_changing_output(self):
+        markdown = "# Title\n\nSome **bold** text\n\n* a\n* b"
+        expected = markdown_to_html_node(markdown).to_html()
+        INLINE_CACHE.clear()
+        active = profiler.enable()
+        try:
+            with profiler.page("page.md"):
+                html = markdown_to_html_node(markdown).to_html()
+        finally:
+            profiler.disable()
+        self.assertEqual(expected, html)
+
+        report = active.report()
+        stages = {entry["stage"]: entry for entry in report["stages"]}
+        self.assertEqual(1, stages["markdown_to_blocks"]["calls"])
+        self.assertEqual(1, stages["text_to_textnodes"]["calls"])
+        self.assertEqual(["page.md"], [entry["page"] for entry in report["slowest_pages"]])
+
+    def test_streamed_pages_time_parsing_serialization_and_writes(self):
+        markdown = "# Title\n\nSome **bold** text\n\n* a\n* b"
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "page.md")
+            dest = os.path.join(tmp, "page.html")
+            with open(source, 'w') as f:
+                f.write(markdown)
+            active = profiler.enable()
+            try:
+                write_if_changed(dest, BlockStream(source).to_html_chunks())
+            finally:
+                profiler.disable()
+            with open(dest) as f:
+                self.assertEqual(markdown_to_html_node(markdown).to_html(), f.read())
+
+        stages = {entry["stage"] for entry in active.report()["stages"]}
+        self.assertLessEqual({"markdown_to_blocks", "blocks_to_html_nodes", "to_html", "write"}, stages)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import json, os, tempfile, unittest
+from collections import Counter
+
+from search import SearchIndex, finish_terms, tokenize
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.tmp.name, "public")
+        self.state = os.path.join(self.tmp.name, "search.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, name):
+        with open(os.path.join(self.public, "search", name)) as f:
+            return json.load(f)
+
+    def test_tokenize_skips_markup_and_urls(self):
+        terms = Counter()
+        tokenize("# Über **bold** text, [a link](/secret/url) and `code_word`", terms)
+        tokenize("more bold — text x", terms)
+        self.assertEqual({"über": 1, "bold": 2, "text": 2, "link": 1, "and": 1, "code": 1, "word": 1, "more": 1},
+                         dict(finish_terms(terms)))
+
+    def test_incremental_updates_only_affected_shards(self):
+        index = SearchIndex(self.state, self.public)
+        result = index.update({
+            "a.md": ("/a/", "A", Counter({"apple": 2, "banana": 1}), "h1"),
+            "b.md": ("/b/", "B", Counter({"apple": 1, "cherry": 3}), "h2"),
+        }, {"a.md", "b.md"})
+        index.save()
+        self.assertEqual(3, result.written)
+        self.assertEqual({"apple": [0, 2, 1, 1]}, self.read("ap.json"))
+        self.assertEqual({"0": ["/a/", "A"], "1": ["/b/", "B"]}, self.read("docs.json")["docs"])
+
+        index = SearchIndex(self.state, self.public)
+        result = index.update({"b.md": ("/b/", "B", Counter({"apple": 1, "date": 1}), "h3")}, {"b.md"})
+        self.assertEqual((2, 0, 2), (result.written, result.unchanged, result.removed))
+        self.assertEqual({"apple": [1, 1]}, self.read("ap.json"))
+        self.assertEqual(["ap", "da"], self.read("docs.json")["shards"])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "search", "ch.json")))
+
+
+    def test_rebuilding_from_scratch_only_removes_index_files(self):
+        index = SearchIndex(self.state, self.public)
+        index.update({"a.md": ("/a/", "A", Counter({"apple": 1}), "h1")}, {"a.md"})
+        for name in ("index.html", "notes.json"):
+            with open(os.path.join(self.public, "search", name), 'w') as f:
+                f.write("page")
+        index = SearchIndex(self.state, self.public)
+        index.update({"b.md": ("/b/", "B", Counter({"cherry": 1}), "h2")}, {"b.md"})
+        self.assertEqual(["ch.json", "docs.json", "index.html", "notes.json"],
+                         sorted(os.listdir(os.path.join(self.public, "search"))))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import http.client
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from functools import partial
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server import CORSHTTPRequestHandler
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp.name, "index.html"), 'w') as f:
+            f.write("<p>hi</p>")
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0),
+                                         partial(CORSHTTPRequestHandler, directory=self.tmp.name))
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.tmp.cleanup()
+
+    def test_options_keeps_connection_usable(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.httpd.server_address[1], timeout=5)
+        try:
+            conn.request("OPTIONS", "/index.html")
+            response = conn.getresponse()
+            self.assertEqual(200, response.status)
+            self.assertEqual("0", response.getheader("Content-Length"))
+            self.assertEqual(b"", response.read())
+            self.assertEqual("*", response.getheader("Access-Control-Allow-Origin"))
+
+            conn.request("GET", "/index.html")
+            response = conn.getresponse()
+            self.assertEqual(200, response.status)
+            self.assertEqual(b"<p>hi</p>", response.read())
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from htmlnode import LeafNode, ParentNode
+from template import Template, build_date, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = Template("<title> {{ Title }} </title>{{Content}}<p>{{ tags }} {{ missing }}{{ Date }}</p>")
+        self.assertEqual(["Title", "Content", "tags", "missing", "Date"], template.slots)
+
+        context = {
+            "Title": "Home",
+            "Content": ParentNode("div", [LeafNode("b", "hi")]),
+            "tags": ["a", "b"],
+            "Date": "2024-01-01",
+        }
+        expected = "<title> Home </title><div><b>hi</b></div><p>a, b 2024-01-01</p>"
+        self.assertEqual(expected, template.render(context))
+
+        fp = io.StringIO()
+        template.write(fp, context)
+        self.assertEqual(expected, fp.getvalue())
+
+        self.assertEqual("no slots", Template("no slots").render({}))
+
+    def test_load_template_is_cached(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, 'w') as f:
+                f.write("{{ Title }}")
+            template = load_template(path)
+            self.assertIs(template, load_template(path))
+
+            with open(path, 'w') as f:
+                f.write("<h1>{{ Title }}</h1>")
+            os.utime(path, ns=(0, 0))
+            self.assertEqual("<h1>x</h1>", load_template(path).render({"Title": "x"}))
+
+    def test_build_date(self):
+        with mock.patch.dict(os.environ, {"SOURCE_DATE_EPOCH": "0"}):
+            self.assertEqual("1970-01-01", build_date())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
+import os
 import unittest
 
+from blocks import markdown_to_blocks
 from textnode import TextNode, extract_markdown_images, extract_markdown_links, split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
 from htmlnode import text_node_to_html_node
 
@@ -119,14 +121,17 @@ class TestTextNode(unittest.TestCase):
         expected = []
         self.assertEqual(expected, extract_markdown_links(text))
 
-        # text = "This is text with an ![image](https://i.imgur.com/zjjcJKZ.png) and ![another](https://i.imgur.com/dfsdkjfd.png)"
-        # expected = []
-        # self.assertEqual(expected, extract_markdown_links(text))
+        text = "This is text with an ![image](https://i.imgur.com/zjjcJKZ.png) and ![another](https://i.imgur.com/dfsdkjfd.png)"
+        expected = []
+        self.assertEqual(expected, extract_markdown_links(text))
 
         text = "[Back Home](/)"
         expected = [("Back Home", "/")]
         self.assertEqual(expected, extract_markdown_links(text))
 
+        text = "An ![image](/a.png) next to a [link](/b) and ![another](/c.png)"
+        self.assertEqual([("link", "/b")], extract_markdown_links(text))
+
 
     def test_split_images(self):
         node = TextNode(
@@ -161,11 +166,11 @@ class TestTextNode(unittest.TestCase):
         node = TextNode("This is a node with no links", "text")
         self.assertEqual([node], split_nodes_link([node]))
 
-        # node = TextNode(
-        #     "This is text with an ![image](https://i.imgur.com/zjjcJKZ.png) and ![another](https://i.imgur.com/dfsdkjfd.png)",
-        #     "text",
-        # )
-        # self.assertEqual([node], split_nodes_link([node]))
+        node = TextNode(
+            "This is text with an ![image](https://i.imgur.com/zjjcJKZ.png) and ![another](https://i.imgur.com/dfsdkjfd.png)",
+            "text",
+        )
+        self.assertEqual([node], split_nodes_link([node]))
 
 
     def test_text_to_nodes(self):
@@ -193,5 +198,79 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(expected, text_to_textnodes(text))
 
 
+def chained_text_to_textnodes(text):
+    nodes = [TextNode(text, "text")]
+    for text_type, delimiter in zip(["bold", "italic", "code"], ["**", "*", "`"]):
+        nodes = split_nodes_delimiter(nodes, delimiter, text_type)
+    nodes = split_nodes_image(nodes)
+    return split_nodes_link(nodes)
+
+
+class TestInlineTokenizer(unittest.TestCase):
+    corpus = [
+        "",
+        "Plain text with no markup at all",
+        "This is text with a `code block` word",
+        "This is text with an *italic* word",
+        "This is text with a **bold** word",
+        "**This text is all bold**",
+        "This is text with an ![image](https://i.imgur.com/zjjcJKZ.png) and ![another](https://i.imgur.com/dfsdkjfd.png)",
+        "This is text with a [link](https://www.example.com) and [another](https://www.example.com/another)",
+        "This is **text** with an *italic* word and a `code block` and an ![image](https://i.imgur.com/zjjcJKZ.png) and a [link](https://boot.dev)",
+        "[Back Home](/)",
+        "Exclamation! Brackets [not a link] and (parens)",
+        "**bold**, *italic*, `code`, **more bold** and [a](b)![c](d)",
+        "*see [docs](/d)*",
+        "**[a](b)**",
+        "**bold *italic* inside**",
+        "**`y`**",
+        "**bold `code` and [a link](/a) with ![an image](/i.png) after** then *italic `x`*",
+    ]
+    invalid = [
+        "This is text with *invalid** markdown",
+        "This is text with invalid** markdown",
+        "Unclosed `code",
+        "Empty **** bold",
+    ]
+    divergent = [
+        ("`[x](u)`", [TextNode("[x](u)", "code")]),
+        ("`![i](u)`", [TextNode("![i](u)", "code")]),
+        ("`***`", [TextNode("***", "code")]),
+        ("[`](`)", [TextNode("`", "link", "`")]),
+        ("[b[x](u)", [TextNode("[b", "text"), TextNode("x", "link", "u")]),
+        ("![[x](u)", [TextNode("![", "text"), TextNode("x", "link", "u")]),
+    ]
+
+    def content_blocks(self):
+        content_dir = os.path.join(os.path.dirname(__file__), "..", "content")
+        for dirpath, _, filenames in os.walk(content_dir):
+            for filename in filenames:
+                if filename.endswith(".md"):
+                    with open(os.path.join(dirpath, filename)) as f:
+                        yield from markdown_to_blocks(f.read())
+
+    def test_matches_chained_passes(self):
+        for text in self.corpus + list(self.content_blocks()):
+            try:
+                expected = chained_text_to_textnodes(text)
+            except ValueError:
+                self.assertRaises(ValueError, text_to_textnodes, text)
+                continue
+            self.assertEqual(expected, text_to_textnodes(text), text)
+
+    def test_documented_divergences(self):
+        for text, expected in self.divergent:
+            self.assertEqual(expected, text_to_textnodes(text), text)
+            try:
+                self.assertNotEqual(expected, chained_text_to_textnodes(text), text)
+            except ValueError:
+                pass
+
+    def test_invalid_markdown(self):
+        for text in self.invalid:
+            self.assertRaises(ValueError, chained_text_to_textnodes, text)
+            self.assertRaises(ValueError, text_to_textnodes, text)
+
+
 if __name__ == "__main__":
     unittest.main()
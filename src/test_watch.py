@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+from watch import LiveBuilder, PollingWatcher
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.public = os.path.join(root, "public")
+        self.template = os.path.join(root, "template.html")
+        os.makedirs(self.content)
+        os.makedirs(self.static)
+        self.write(self.template, "{{ Title }}|{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.builder = LiveBuilder(self.content, self.static, self.template, self.public, os.path.join(root, "cache"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_apply_changes(self):
+        self.builder.build()
+        watcher = PollingWatcher(self.builder.roots)
+        self.assertEqual(set(), watcher.poll())
+
+        page = os.path.join(self.content, "post.md")
+        self.write(page, "# Post")
+        self.write(os.path.join(self.static, "a.css"), "a {}")
+        changed = watcher.poll()
+        self.assertEqual({os.path.normpath(page), os.path.normpath(os.path.join(self.static, "a.css"))}, changed)
+        self.assertEqual((1, 0), self.builder.apply(changed))
+        self.assertEqual("Post|<div><h1>Post</h1></div>", self.read(os.path.join(self.public, "post.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "a.css")))
+
+        os.remove(page)
+        self.assertEqual((0, 1), self.builder.apply(watcher.poll()))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "post.html")))
+
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual((1, 0), self.builder.apply(watcher.poll()))
+        self.assertEqual("<title>Home</title><div><h1>Home</h1></div>", self.read(os.path.join(self.public, "index.html")))
+
+    def test_templates_and_includes_rerender_their_pages(self):
+        alt = os.path.join(os.path.dirname(self.template), "alt.html")
+        foot = os.path.join(os.path.dirname(self.template), "foot.html")
+        self.write(foot, "<footer>one</footer>")
+        self.write(alt, "{{ Content }}{{> foot.html }}")
+        self.write(os.path.join(self.content, "alt.md"), "---\ntemplate: alt.html\n---\n# Alt")
+        self.builder.build()
+        watcher = PollingWatcher(self.builder.roots)
+        self.assertLessEqual({os.path.normpath(alt), os.path.normpath(foot)}, set(watcher.roots))
+
+        self.write(foot, "<footer>two</footer>")
+        self.assertEqual((1, 0), self.builder.apply(watcher.poll()))
+        self.assertEqual("<div><h1>Alt</h1></div><footer>two</footer>", self.read(os.path.join(self.public, "alt.html")))
+        self.assertEqual("Home|<div><h1>Home</h1></div>", self.read(os.path.join(self.public, "index.html")))
+
+        self.write(alt, "<main>{{ Content }}</main>")
+        self.assertEqual((1, 0), self.builder.apply(watcher.poll()))
+        self.assertEqual("<main><div><h1>Alt</h1></div></main>", self.read(os.path.join(self.public, "alt.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
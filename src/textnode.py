@@ -2,6 +2,8 @@ import re
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -39,7 +41,7 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 def split_nodes_image(old_nodes):
     new_nodes = []
     for node in old_nodes:
-        if type(node) != TextNode:
+        if type(node) != TextNode or "![" not in node.text:
             new_nodes.append(node)
             continue
 
@@ -65,7 +67,7 @@ def split_nodes_image(old_nodes):
 def split_nodes_link(old_nodes):
     new_nodes = []
     for node in old_nodes:
-        if type(node) != TextNode:
+        if type(node) != TextNode or "[" not in node.text:
             new_nodes.append(node)
             continue
 
@@ -88,21 +90,102 @@ def split_nodes_link(old_nodes):
     return new_nodes
 
 
+MARKDOWN_IMAGE = re.compile(r"!\[(.*?)\]\((.*?)\)")
+MARKDOWN_LINK = re.compile(r"\[(.*?)\]\((.*?)\)")
+
+
 def extract_markdown_images(text):
-    return re.findall(r"!\[(.*?)\]\((.*?)\)", text)
+    if "![" not in text:
+        return []
+    return MARKDOWN_IMAGE.findall(text)
 
 
 def extract_markdown_links(text):
-    return re.findall(r"\[(.*?)\]\((.*?)\)", text)
+    if "[" not in text:
+        return []
+    if "![" not in text:
+        return MARKDOWN_LINK.findall(text)
+    return [match.groups() for match in MARKDOWN_LINK.finditer(text) if text[match.start() - 1:match.start()] != "!"]
 
 
-def text_to_textnodes(text):
-    nodes = [TextNode(text, "text")]
-    for text_type, delimiter in zip(["bold", "italic", "code"], ["**", "*", "`"]):
-        nodes = split_nodes_delimiter(nodes, delimiter, text_type)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    
-    # print(f"\n\nTEXT:\n{text}\nNODES:\n{'\n'.join([str(node) for node in nodes])}")
+def has_inline_markup(text):
+    return "*" in text or "`" in text or "[" in text or "!" in text
+
+
+INLINE_MARKUP = re.compile(r"[*`!\[]")
+INLINE_IMAGE = re.compile(r"!\[([^\[\]]*)\]\(([^()]*)\)")
+INLINE_LINK = re.compile(r"\[([^\[\]]*)\]\(([^()]*)\)")
+
 
+def text_to_textnodes(text):
+    if not has_inline_markup(text):
+        return [TextNode(text, "text")]
+    nodes = []
+    scan_inline(text, "text", nodes)
+    if not nodes:
+        nodes.append(TextNode(text, "text"))
     return nodes
+
+
+def scan_inline(text, text_type, nodes):
+    plain_start = 0
+    pos = 0
+    segment = []
+    linked = False
+    while True:
+        match = INLINE_MARKUP.search(text, pos)
+        if match is None:
+            break
+        pos = match.start()
+        char = text[pos]
+
+        if char == "!" or char == "[":
+            pattern, span_type = (INLINE_IMAGE, "image") if char == "!" else (INLINE_LINK, "link")
+            span = pattern.match(text, pos)
+            if span is None:
+                pos += 1
+                continue
+            if plain_start < pos:
+                segment.append(TextNode(text[plain_start:pos], text_type))
+                nodes.append(segment[-1])
+            nodes.append(TextNode(span.group(1), span_type, span.group(2)))
+            linked = True
+            pos = plain_start = span.end()
+            continue
+
+        if text.startswith("**", pos):
+            delimiter, span_type = "**", "bold"
+        elif char == "*":
+            delimiter, span_type = "*", "italic"
+        else:
+            delimiter, span_type = "`", "code"
+        content_start = pos + len(delimiter)
+        end = text.find(delimiter, content_start)
+        if end == -1:
+            raise ValueError(f"{text} is not valid markdown\nDelimiter: {delimiter}")
+        if end == content_start:
+            raise ValueError(f"{text} has no content within delimiter {delimiter}")
+        if plain_start < pos:
+            segment.append(TextNode(text[plain_start:pos], text_type))
+            nodes.append(segment[-1])
+        if linked:
+            unstyle(segment)
+        segment = []
+        linked = False
+        if span_type == "code":
+            nodes.append(TextNode(text[content_start:end], span_type))
+        else:
+            scan_inline(text[content_start:end], span_type, nodes)
+        pos = plain_start = end + len(delimiter)
+
+    if plain_start < len(text):
+        segment.append(TextNode(text[plain_start:], text_type))
+        nodes.append(segment[-1])
+    if linked:
+        unstyle(segment)
+
+
+def unstyle(segment):
+    # split_nodes_image/link emit the text around a link as plain text, even inside bold or italic
+    for node in segment:
+        node.text_type = "text"
@@ -0,0 +1,240 @@
+import os, time
+
+from assets import sync_dir
+from depgraph import INCLUDE, TEMPLATE, node, page_dependencies
+from frontmatter import scan_page
+from inventory import scan_tree
+from main import build, dest_for_source, page_template, write_page
+from template import load_template
+from manifest import BuildManifest, CACHE_DIR, hash_file
+from output import remove_output
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+
+def scan(roots):
+    snapshot = {}
+    for root in roots:
+        if os.path.isfile(root):
+            stat = os.stat(root)
+            snapshot[root] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        try:
+            inventory = scan_tree(root)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        for entry in inventory:
+            snapshot[entry.path] = (entry.mtime_ns, entry.size)
+    return snapshot
+
+
+class PollingWatcher:
+    def __init__(self, roots, interval=0.1) -> None:
+        self.roots = []
+        self.interval = interval
+        self.snapshot = {}
+        for root in roots:
+            self.add(root)
+
+    def add(self, root):
+        root = os.path.normpath(root)
+        if root not in self.roots:
+            self.roots.append(root)
+            self.snapshot.update(scan([root]))
+
+    def poll(self):
+        current = scan(self.roots)
+        changed = {path for path, stat in current.items() if self.snapshot.get(path) != stat}
+        changed.update(path for path in self.snapshot if path not in current)
+        self.snapshot = current
+        return changed
+
+    def wait(self):
+        while True:
+            changed = self.poll()
+            if changed:
+                return changed
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    def __init__(self, roots, interval=0.02) -> None:
+        self.interval = interval
+        self.inotify = INotify()
+        self.mask = (flags.CREATE | flags.CLOSE_WRITE | flags.MODIFY | flags.DELETE
+                     | flags.MOVED_FROM | flags.MOVED_TO | flags.ATTRIB)
+        self.dirs = {}
+        self.files = set()
+        self.trees = []
+        for root in roots:
+            self.add(root)
+
+    def add(self, root):
+        root = os.path.normpath(root)
+        if root in self.files or root in self.trees:
+            return
+        if os.path.isfile(root):
+            self.files.add(root)
+            self.add_watch(os.path.dirname(root) or ".")
+        else:
+            self.trees.append(root)
+            self.add_tree(root)
+
+    def add_watch(self, path):
+        try:
+            self.dirs[self.inotify.add_watch(path, self.mask)] = path
+        except OSError:
+            pass
+
+    def add_tree(self, root):
+        for dirpath, _, _ in os.walk(root):
+            self.add_watch(os.path.normpath(dirpath))
+
+    def wait(self):
+        changed = set()
+        timeout = None
+        while True:
+            events = self.inotify.read(timeout=timeout)
+            if not events and changed:
+                return changed
+            for event in events:
+                directory = self.dirs.get(event.wd)
+                if directory is None or not event.name:
+                    continue
+                path = os.path.normpath(os.path.join(directory, event.name))
+                if path not in self.files and not any(is_under(path, tree) for tree in self.trees):
+                    continue
+                changed.add(path)
+                if event.mask & flags.ISDIR and event.mask & (flags.CREATE | flags.MOVED_TO):
+                    self.add_tree(path)
+                    changed.update(scan([path]))
+            timeout = int(self.interval * 1000)
+
+    def close(self):
+        self.inotify.close()
+
+
+def make_watcher(roots, interval=0.1):
+    if INotify is not None:
+        try:
+            return InotifyWatcher(roots)
+        except OSError:
+            pass
+    return PollingWatcher(roots, interval)
+
+
+def is_under(path, root):
+    root = os.path.normpath(root)
+    return path == root or path.startswith(root + os.sep)
+
+
+class LiveBuilder:
+    def __init__(self, content_dir="./content/", static_dir="./static/", template_path="./template.html",
+                 public_dir="./public/", cache_dir=CACHE_DIR) -> None:
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = os.path.normpath(template_path)
+        self.public_dir = public_dir
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self.manifest = None
+
+    @property
+    def roots(self):
+        roots = [self.content_dir, self.static_dir, self.template_path]
+        if self.manifest is not None:
+            templates = set()
+            for page in self.manifest.pages.values():
+                for dep in page.get("deps", ()):
+                    kind, _, path = dep.partition(":")
+                    if kind in (TEMPLATE, INCLUDE):
+                        templates.add(path)
+            templates.discard(self.template_path)
+            roots.extend(sorted(templates))
+        return roots
+
+    def dependents(self, changed):
+        nodes = {node(kind, path) for path in changed for kind in (TEMPLATE, INCLUDE)}
+        return {source for source, page in self.manifest.pages.items() if nodes.intersection(page.get("deps", ()))}
+
+    def build(self):
+        rendered, _, removed, _, _ = build(self.content_dir, self.static_dir, self.template_path, self.public_dir, self.cache_dir)
+        self.manifest = BuildManifest.load(self.manifest_path)
+        return rendered, removed
+
+    def render(self, from_path):
+        dest_path = dest_for_source(os.path.relpath(from_path, self.content_dir), self.public_dir)
+        try:
+            page = scan_page(from_path, dest_path)
+            if page.draft:
+                self.remove(from_path)
+                return False
+            template_path = page_template(page, self.template_path)
+            template = load_template(template_path)
+            previous = self.manifest.pages.get(from_path, {})
+            previous_output = previous.get("output") if previous.get("dest") == dest_path else None
+            links, output, _ = write_page(from_path, template, dest_path, page, previous_output=previous_output)
+        except Exception as e:
+            print(f"{from_path}: {type(e).__name__}: {e}")
+            self.manifest.pages.pop(from_path, None)
+            return False
+        deps = page_dependencies(template_path, template, links, dest_path, self.public_dir, self.static_dir)
+        self.manifest.pages[from_path] = {"hash": hash_file(from_path), "dest": dest_path, "links": links, "deps": deps,
+                                         "output": output}
+        return True
+
+    def remove(self, from_path):
+        removed = 0
+        for path in [path for path in self.manifest.pages if path == from_path or is_under(path, from_path)]:
+            remove_output(self.manifest.pages.pop(path)["dest"], self.public_dir)
+            removed += 1
+        return removed
+
+    def apply(self, changed):
+        if self.template_path in changed or changed.intersection(load_template(self.template_path).includes):
+            return self.build()
+        rendered = removed = 0
+        static_changed = False
+        for path in sorted(changed | self.dependents(changed)):
+            if is_under(path, self.static_dir):
+                static_changed = True
+            elif not is_under(path, self.content_dir):
+                continue
+            elif os.path.isfile(path):
+                if path.endswith(".md") and self.render(path):
+                    rendered += 1
+            elif not os.path.isdir(path):
+                removed += self.remove(path)
+        if static_changed:
+            outputs = {page["dest"] for page in self.manifest.pages.values()}
+            result = sync_dir(self.static_dir, self.public_dir, self.manifest.assets, outputs)
+            self.manifest.assets = result.assets
+        return rendered, removed
+
+    def save(self):
+        self.manifest.save()
+
+
+def watch(builder, on_change=None, interval=0.1):
+    builder.build()
+    watcher = make_watcher(builder.roots, interval)
+    print(f"Watching {', '.join(builder.roots)} ({type(watcher).__name__})")
+    try:
+        while True:
+            changed = watcher.wait()
+            start = time.perf_counter()
+            rendered, removed = builder.apply(changed)
+            for root in builder.roots:
+                watcher.add(root)
+            if on_change is not None:
+                on_change(changed)
+            print(f"Rebuilt {rendered} page(s), removed {removed} in {(time.perf_counter() - start) * 1000:.1f} ms")
+            builder.save()
+    finally:
+        watcher.close()